@@ -3,8 +3,12 @@ from django.contrib import admin
 
 # Register your models here.
 from apps.chat.models import ChatMessage
+from django.db.models.functions import Substr
 from django.utils.html import format_html
 
+# Characters shown in the list view before truncating with "..."
+MESSAGE_PREVIEW_LENGTH = 50
+
 
 @admin.register(ChatMessage)
 class ChatAdmin(admin.ModelAdmin):
@@ -49,6 +53,32 @@ class ChatAdmin(admin.ModelAdmin):
     # Reduce noise in admin logs
     save_on_top = True
 
+    # Rows per changelist page
+    list_per_page = 50
+
+    # Badge styles, cached by the browser instead of inlined per row
+    class Media:
+        css = {
+            'all': ('admin/chat_risk.css',)
+        }
+
+    def get_queryset(self, request):
+        """
+        On the list page, fetch only a prefix of each message
+
+        Full message/response TEXT columns are deferred; one extra
+        character is fetched so short_message knows when to truncate.
+        """
+        queryset = super().get_queryset(request)
+
+        match = request.resolver_match
+        if match and match.url_name.endswith('_changelist'):
+            queryset = queryset.annotate(
+                message_preview=Substr('message', 1, MESSAGE_PREVIEW_LENGTH + 1)
+            ).defer('message', 'response')
+
+        return queryset
+
     # ------ CUSTOM DISPLAY METHODS ------ #
 
     def user_email(self, obj):
@@ -58,23 +88,17 @@ class ChatAdmin(admin.ModelAdmin):
 
     def short_message(self, obj):
         """Short preview of user message."""
-        return (obj.message[:50] + "...") if len(obj.message) > 50 else obj.message
+        message = getattr(obj, 'message_preview', None) or obj.message
+        if len(message) > MESSAGE_PREVIEW_LENGTH:
+            return message[:MESSAGE_PREVIEW_LENGTH] + "..."
+        return message
     short_message.short_description = "Message"
 
     def risk_level_badge(self, obj):
-        """Color-coded risk level badge for clarity."""
-        color_map = {
-            'SAFE': 'green',
-            'MEDIUM': 'orange',
-            'HIGH': 'red',
-            'CRITICAL': 'darkred',
-        }
-        color = color_map.get(obj.risk_level, 'gray')
-
+        """Color-coded risk level badge (colors live in chat_risk.css)."""
         return format_html(
-            '<span style="padding:4px 8px; border-radius:4px; '
-            'color:white; background-color:{}; font-weight:600;">{}</span>',
-            color,
+            '<span class="risk-badge risk-{}">{}</span>',
+            obj.risk_level.lower(),
             obj.risk_level
         )
     risk_level_badge.short_description = "Risk Level"
@@ -5,23 +5,481 @@ Uses DistilRoBERTa fine-tuned on emotion classification
 Model: j-hartmann/emotion-english-distilroberta-base
 """
 
-from transformers import pipeline
+import os
+import fcntl
+import functools
+import hashlib
 import logging
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import numpy as np
+import onnxruntime as ort
+import psutil
+import torch
+from decouple import config
+from django.core.cache import cache
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import (
+    AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+)
+
+from apps.chat.prompts import ADAPTATION_BY_EMOTION, HIGH_URGENCY_ADAPTATION
 
 # Suppress transformer warnings
 logging.getLogger("transformers").setLevel(logging.ERROR)
 
-# Initialize emotion classifier (loads once, then cached.)
+logger = logging.getLogger(__name__)
+
+# Fine-tuned DistilRoBERTa checkpoint, and where its INT8 ONNX export lives
+EMOTION_MODEL_PATH = config(
+    'EMOTION_MODEL_PATH', default='/home/d3mxn/Documents/emotion_model'
+)
+EMOTION_ONNX_PATH = config(
+    'EMOTION_ONNX_PATH', default=os.path.join(EMOTION_MODEL_PATH, 'onnx-int8')
+)
+QUANTIZED_FILE_NAME = 'model_quantized.onnx'
+
+# 'onnx' (INT8 ONNX Runtime), 'torch' (plain PyTorch checkpoint) or
+# 'triton' (shared Triton Inference Server, see triton_models/).
+# With a CUDA GPU the PyTorch model on the GPU is the faster default.
+CUDA_AVAILABLE = torch.cuda.is_available()
+EMOTION_BACKEND = config(
+    'EMOTION_BACKEND', default='torch' if CUDA_AVAILABLE else 'onnx'
+)
+
+# The PyTorch backend runs on the GPU in FP16 (tensor cores) when available
+EMOTION_DEVICE = torch.device(
+    'cuda' if EMOTION_BACKEND == 'torch' and CUDA_AVAILABLE else 'cpu'
+)
+USE_FP16 = EMOTION_DEVICE.type == 'cuda'
+
+# Opt-in: compile the PyTorch model with inductor (fused kernels) on the
+# GPU path only. Compilation happens on the first forward, i.e. during
+# warm-up, and variable batch/sequence shapes can trigger recompiles, so
+# enable it only after measuring a win on the deployed GPU.
+USE_COMPILE = (
+    EMOTION_DEVICE.type == 'cuda'
+    and config('EMOTION_COMPILE', default=False, cast=bool)
+)
+
+# Triton gRPC endpoint and model name (EMOTION_BACKEND='triton')
+TRITON_URL = config('TRITON_URL', default='localhost:8001')
+TRITON_MODEL_NAME = config('TRITON_MODEL_NAME', default='emotion')
+
+# Longest input fed to the model (in tokens)
+MAX_INPUT_TOKENS = 256
+
+# Micro-batching: requests arriving within MAX_WAIT_MS share one forward pass
+MAX_BATCH = 32
+MAX_WAIT_MS = 8
+# Length-sorted batches are split into padded chunks of this size,
+# so a short message isn't padded to the longest one in the window
+PAD_BUCKET_SIZE = 8
+# Seconds a request waits for its batch before giving up
+BATCH_RESULT_TIMEOUT = 10
+
+# Results are cached per process (LRU) and in the shared Django cache
+EMOTION_LRU_SIZE = 4096
+EMOTION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# One intra-op thread per physical core; hyperthreads only add contention
+PHYSICAL_CORES = psutil.cpu_count(logical=False) or 1
+torch.set_num_threads(PHYSICAL_CORES)
+
+# BF16 halves weight bandwidth on CPUs with native AVX512-BF16 support.
+# Only applies to the PyTorch backend; everything else stays FP32.
+USE_BF16 = (
+    EMOTION_BACKEND == 'torch'
+    and not USE_FP16
+    and getattr(torch.cpu, '_is_avx512_bf16_supported', lambda: False)()
+)
+
+
+def quantized_model_exists():
+    return os.path.exists(os.path.join(EMOTION_ONNX_PATH, QUANTIZED_FILE_NAME))
+
+
+def export_quantized_model():
+    """
+    ONE-TIME ONNX EXPORT + INT8 DYNAMIC QUANTIZATION
+
+    Exports the PyTorch checkpoint to ONNX, then quantizes the weights
+    of the matmul-heavy encoder blocks to INT8 (VNNI kernels on CPU).
+    Skipped when a quantized export already exists on disk.
+
+    Meant to run at build/deploy time (`manage.py export_emotion_model`).
+    If a worker gets here first, concurrent workers are serialised by a
+    file lock, and the export is written to a temporary directory that
+    is renamed into place, so EMOTION_ONNX_PATH is never half-written.
+    """
+    if quantized_model_exists():
+        return
+
+    parent = os.path.dirname(os.path.abspath(EMOTION_ONNX_PATH))
+    os.makedirs(parent, exist_ok=True)
+
+    with open(f"{EMOTION_ONNX_PATH}.lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        # Another process may have finished while we waited for the lock
+        if quantized_model_exists():
+            return
+
+        print("Exporting emotion model to ONNX (INT8)... (one-time setup)")
+        tmp_dir = tempfile.mkdtemp(prefix='.onnx-export-', dir=parent)
+        try:
+            onnx_model = ORTModelForSequenceClassification.from_pretrained(
+                EMOTION_MODEL_PATH,
+                export=True
+            )
+            quantizer = ORTQuantizer.from_pretrained(onnx_model)
+            quantizer.quantize(
+                save_dir=tmp_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(
+                    is_static=False,
+                    per_channel=False
+                )
+            )
+
+            # Leftovers of an interrupted export from before the lock
+            if os.path.isdir(EMOTION_ONNX_PATH):
+                shutil.rmtree(EMOTION_ONNX_PATH)
+            os.replace(tmp_dir, EMOTION_ONNX_PATH)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+class TritonEmotionModel:
+    """
+    Thin gRPC client for the emotion model served by Triton
+
+    Called like the local models (tokenizer tensors in, `.logits` out),
+    so the batcher and post-processing don't change. Each Django worker
+    keeps only the tokenizer; the model lives once, in Triton, which
+    batches requests across workers (dynamic_batching in config.pbtxt).
+    """
+
+    def __init__(self, url=TRITON_URL, model_name=TRITON_MODEL_NAME):
+        # Optional dependency, only needed for this backend
+        import tritonclient.grpc as grpcclient
+
+        self.grpcclient = grpcclient
+        self.client = grpcclient.InferenceServerClient(url=url)
+        self.model_name = model_name
+        self.config = AutoConfig.from_pretrained(EMOTION_MODEL_PATH)
+
+    def __call__(self, input_ids, attention_mask):
+        inputs = []
+        for name, tensor in (
+            ('input_ids', input_ids),
+            ('attention_mask', attention_mask)
+        ):
+            array = tensor.numpy().astype(np.int64, copy=False)
+            infer_input = self.grpcclient.InferInput(name, array.shape, 'INT64')
+            infer_input.set_data_from_numpy(array)
+            inputs.append(infer_input)
+
+        result = self.client.infer(
+            self.model_name,
+            inputs,
+            outputs=[self.grpcclient.InferRequestedOutput('logits')]
+        )
+        return SimpleNamespace(
+            logits=torch.from_numpy(result.as_numpy('logits'))
+        )
+
+
+def load_emotion_model():
+    """
+    Load the emotion model for the configured backend
+
+    All backends take the tokenizer's PyTorch tensors and return
+    an output with `.logits`, so inference code is shared.
+    """
+    if EMOTION_BACKEND == 'triton':
+        return TritonEmotionModel()
+
+    if EMOTION_BACKEND == 'torch':
+        model = AutoModelForSequenceClassification.from_pretrained(
+            EMOTION_MODEL_PATH
+        ).eval()
+        if USE_FP16:
+            model = model.to(EMOTION_DEVICE).half()
+        elif USE_BF16:
+            model = model.to(torch.bfloat16)
+        if USE_COMPILE:
+            model = torch.compile(model, dynamic=True)
+        return model
+
+    export_quantized_model()
+
+    session_options = ort.SessionOptions()
+    session_options.intra_op_num_threads = PHYSICAL_CORES
+    session_options.graph_optimization_level = (
+        ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    )
+
+    return ORTModelForSequenceClassification.from_pretrained(
+        EMOTION_ONNX_PATH,
+        file_name=QUANTIZED_FILE_NAME,
+        session_options=session_options
+    )
+
+
+# Initialize tokenizer + emotion model (loads once, then cached.)
 # This is a TRANSFORMER MODEL - 82M parameters.
 print("Loading emotional detection model... (one-time setup)")
-emotional_classifier = pipeline(
-    "text-classification",
-    model='/home/d3mxn/Documents/emotion_model',
-    top_k = None
+emotion_tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL_PATH, use_fast=True)
+if not emotion_tokenizer.is_fast:
+    # use_fast silently falls back to the Python tokenizer without tokenizer.json
+    logger.warning("Emotion tokenizer is not the fast (Rust) implementation")
+emotion_model = load_emotion_model()
+EMOTION_LABELS = emotion_model.config.id2label
+print(f"Emotion model loaded successfully! ({EMOTION_BACKEND} on {EMOTION_DEVICE})")
+
+# Label names in logit order, and index groups for the sentiment sums
+LABEL_NAMES = [EMOTION_LABELS[i] for i in range(len(EMOTION_LABELS))]
+LABEL_INDEX = {label: i for i, label in enumerate(LABEL_NAMES)}
+LABEL_ARRAY = np.array(LABEL_NAMES, dtype=object)
+POSITIVE_IDX = np.array([LABEL_INDEX['joy']])
+NEGATIVE_IDX = np.array([
+    LABEL_INDEX[label] for label in ('anger', 'disgust', 'fear', 'sadness')
+])
+
+
+def inference_precision():
+    """
+    Autocast context for the forward pass (FP16 on GPU, BF16 when
+    enabled on CPU, else no-op)
+    """
+    if USE_FP16:
+        return torch.autocast(device_type='cuda', dtype=torch.float16)
+    if USE_BF16:
+        return torch.autocast(device_type='cpu', dtype=torch.bfloat16)
+    return nullcontext()
+
+
+def predict_emotion_probs(texts):
+    """
+    Run one padded forward pass over a list of texts
+
+    Returns:
+        np.ndarray: (len(texts), num_labels) probabilities in id2label order
+    """
+    inputs = emotion_tokenizer(
+        texts,
+        return_tensors="pt",
+        padding=True,
+        truncation=True,
+        max_length=MAX_INPUT_TOKENS
+    )
+    if USE_FP16:
+        inputs = inputs.to(EMOTION_DEVICE, non_blocking=True)
+    with torch.inference_mode(), inference_precision():
+        logits = emotion_model(**inputs).logits.float()
+    return logits.softmax(-1).cpu().numpy()
+
+
+class EmotionBatcher:
+    """
+    MICRO-BATCHING WORKER
+
+    Coalesces concurrent analyze_emotion() calls into batched forward
+    passes. Callers block on a Future while a single background thread
+    drains the queue: it takes up to MAX_BATCH texts arriving within
+    MAX_WAIT_MS, sorts them by length and runs the model once per
+    PAD_BUCKET_SIZE chunk.
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, text):
+        """
+        Queue one text and wait for its probabilities
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future.result(timeout=BATCH_RESULT_TIMEOUT)
+
+    def _ensure_worker(self):
+        # Started lazily so forked WSGI workers each get their own thread
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name='emotion-batcher',
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            batch.sort(key=lambda item: len(item[0]))
+
+            for start in range(0, len(batch), PAD_BUCKET_SIZE):
+                chunk = batch[start:start + PAD_BUCKET_SIZE]
+                try:
+                    results = predict_emotion_probs([text for text, _ in chunk])
+                except Exception as e:
+                    for _, future in chunk:
+                        future.set_exception(e)
+                    continue
+
+                for (_, future), probs in zip(chunk, results):
+                    future.set_result(probs)
+
+
+emotion_batcher = EmotionBatcher()
+
+
+def warm_up_emotion_model():
+    """
+    Run dummy forward passes so the first real request doesn't pay for
+    kernel selection and cold weight pages
+
+    Goes straight to the model (no fast path, no cache) with a single
+    text and a padded batch, the two shapes the batcher produces. With
+    EMOTION_COMPILE on the GPU this is also where torch.compile builds
+    its graphs.
+    """
+    predict_emotion_probs(["I have been feeling a bit anxious lately"])
+    predict_emotion_probs([
+        "hello world",
+        "I don't know how to tell my family what I'm going through right now",
+    ])
+
+
+# ============================================
+# FAST PATH FOR TRIVIAL MESSAGES
+# ============================================
+
+# Whole-message greetings/acknowledgements (English + Pidgin).
+# Anchored at both ends so "hi, I can't cope" still reaches the model.
+TRIVIAL_MESSAGE_RE = re.compile(
+    r"^(hi+|hello|hey|ok(ay)?|thanks?|thank (you|u)|bye|goodbye|"
+    r"good (morning|afternoon|evening|night)|yes|sure|alright|cool|"
+    r"how far|how you dey|wetin dey|i dey)[\s!.?]*$",
+    re.IGNORECASE
 )
-print("Emotion model loaded successfully!")
 
-def analyze_emotion(text):
+# Very short messages are classified from a small lexicon instead
+SHORT_MESSAGE_MAX_WORDS = 3
+EMOTION_LEXICON = {
+    'sad': 'sadness', 'unhappy': 'sadness', 'depressed': 'sadness',
+    'lonely': 'sadness', 'crying': 'sadness',
+    'scared': 'fear', 'afraid': 'fear', 'anxious': 'fear',
+    'worried': 'fear', 'nervous': 'fear', 'panicking': 'fear',
+    'angry': 'anger', 'mad': 'anger', 'furious': 'anger',
+    'annoyed': 'anger', 'vexed': 'anger',
+    'happy': 'joy', 'glad': 'joy', 'excited': 'joy',
+    'disgusted': 'disgust',
+    'shocked': 'surprise', 'surprised': 'surprise',
+}
+NEGATION_RE = re.compile(r"\b(not|no|never|dont|don't|isn't|ain't|can't)\b")
+WORD_RE = re.compile(r"[a-z']+")
+
+TRIVIAL_CONFIDENCE = 0.9
+LEXICON_CONFIDENCE = 0.8
+
+fast_path_stats = {'calls': 0, 'hits': 0}
+
+
+def fast_path_probs(text):
+    """
+    SKIP THE TRANSFORMER FOR TRIVIAL INPUTS
+
+    Greetings and acknowledgements map to neutral; messages of up to
+    SHORT_MESSAGE_MAX_WORDS words with one unambiguous, un-negated
+    lexicon word map to that emotion. Anything else returns None
+    and goes to the model.
+
+    Returns:
+        list or None: label probabilities in id2label order
+    """
+    fast_path_stats['calls'] += 1
+    text_lower = text.strip().lower()
+
+    if TRIVIAL_MESSAGE_RE.match(text_lower):
+        primary, confidence = 'neutral', TRIVIAL_CONFIDENCE
+    else:
+        words = WORD_RE.findall(text_lower)
+        if len(words) > SHORT_MESSAGE_MAX_WORDS or NEGATION_RE.search(text_lower):
+            return None
+
+        emotions = {EMOTION_LEXICON[w] for w in words if w in EMOTION_LEXICON}
+        if len(emotions) != 1:
+            return None
+        primary, confidence = emotions.pop(), LEXICON_CONFIDENCE
+
+    fast_path_stats['hits'] += 1
+    logger.debug(
+        "Emotion fast path hit rate: "
+        f"{fast_path_stats['hits'] / fast_path_stats['calls']:.0%}"
+    )
+
+    # Spread the remaining probability evenly over the other labels
+    remainder = (1 - confidence) / (len(EMOTION_LABELS) - 1)
+    return [
+        confidence if EMOTION_LABELS[i] == primary else remainder
+        for i in range(len(EMOTION_LABELS))
+    ]
+
+
+# Ranked emotions returned unless the full breakdown is requested
+TOP_EMOTIONS = 3
+
+
+def neutral_emotion_data(include_all=False):
+    """
+    Fallback result (too short to analyse, or the model failed), in the
+    same shape analyze_emotion() returns for the given include_all
+    """
+    emotion_data = {
+        'primary_emotion': 'neutral',
+        'sentiment_score': 0.0,
+        'confidence': 0.0,
+        'urgency': 'low',
+        'all_emotions': []
+    }
+    if include_all:
+        emotion_data['emotion_scores'] = {'neutral': 1.0}
+    return emotion_data
+
+
+def analyze_emotion(text, include_all=False):
     """
     TRANSFORMER-BASED EMOTION DETECTION
     
@@ -32,11 +490,14 @@ def analyze_emotion(text):
     
     Args:
         message (str): User's message
+        include_all (bool): Also return 'emotion_scores' and every ranked
+            emotion. The chat flow only needs the top 3, so by default
+            'emotion_scores' is omitted and 'all_emotions' is the top 3.
         
     Returns:
         dict: {
             'primary_emotion': str,      # dominant emotion
-            'emotion_scores': dict,      # all emotion probabilities
+            'emotion_scores': dict,      # all emotion probabilities (include_all)
             'sentiment_score': float,    # derived overall sentiment
             'confidence': float,         # confidence in primary emotion
             'urgency': str,             # low, medium, high
@@ -44,7 +505,7 @@ def analyze_emotion(text):
         }
     
     Example:
-        >>> analyze_user_emotion("I'm feeling really anxious and scared")
+        >>> analyze_emotion("I'm feeling really anxious and scared", include_all=True)
         {
             'primary_emotion': 'fear',
             'emotion_scores': {
@@ -57,85 +518,135 @@ def analyze_emotion(text):
             'urgency': 'high'
         }
     """
-    # Handle empty messages
-    if not text and len(text.strip()) < 3:
-        return {
-            'primary_emotion': 'neutral',
-            'emotion_scores': { 'neutral': 1.0 },
-            'sentiment_score': 0.0,
-            'confidence_score': 0.0,
-            'urgency': 'low',
-            'all_emotions': []
-        }
+    # Empty/very short messages ("ok", "👍") skip the model entirely
+    text = (text or "").strip()
+    if len(text) < 3:
+        return neutral_emotion_data(include_all)
     
     try:
-        # RUn transformal model inference
-        results = emotional_classifier(text)[0]
+        result = score_emotion_cached(normalize_text(text))
+    except Exception as e:
+        # Fallback if model fails
+        print(f"Emotion detection error")
+        emotion_data = neutral_emotion_data(include_all)
+        emotion_data['error'] = str(e)
+        return emotion_data
+
+    # Rebuild a fresh dict so callers can't mutate the cached result
+    primary_emotion, scores, sentiment_score, confidence, urgency, ranked = result
+    emotion_data = {
+        'primary_emotion': primary_emotion,
+        'sentiment_score': sentiment_score,
+        'confidence': confidence,
+        'urgency': urgency,
+    }
+
+    if include_all:
+        emotion_data['emotion_scores'] = dict(scores)
+    else:
+        ranked = ranked[:TOP_EMOTIONS]
 
-        # Parse result in a clean format
-        emotion_scores = {
-            item['label']: round(item['score'], 4)
-            for item in results
-        }
+    emotion_data['all_emotions'] = [
+        {'emotion': emotion, 'score': score} for emotion, score in ranked
+    ]
+    return emotion_data
 
-        # Identify primary emotion (highest score)
-        primary_emotion = max(emotion_scores, key=emotion_scores.get)
-        confidence = emotion_scores[primary_emotion]
-
-        # Calculate overall sentiment
-        # Positive emotions: joy
-        # Negative emotions: anger, disgust, fear, sadness
-        # Neutral: neutral, surprise (can be either)
-        positive_score = emotion_scores.get('joy', 0)
-        negative_score = sum(
-            [
-                emotion_scores.get('anger', 0),
-                emotion_scores.get('disgust'),
-                emotion_scores.get('fear', 0),
-                emotion_scores.get('sadness', 0)
-            ]
-        )
-        neutral_score = emotion_scores.get('neutral', 0)
-
-        # Calculates sentiment score: from -1 to 1
-        # -1 -> negative sentiment
-        # 0 -> neutral
-        # +1 -> positive sentiment
-        if positive_score + negative_score > 0:
-            sentiment_score = (positive_score - negative_score) / (positive_score + negative_score)
-        else:
-            sentiment_score = 0.0
-        
-        # Determine urgency based on emotion + confidence
-        urgency = calculate_urgency(primary_emotion, confidence, emotion_scores)
-
-        # Rank all emotions, from highest score to lowest
-        all_emotions = sorted(
-            [{ 'emotion': k, 'score': v } for k, v in emotion_scores.items()],
-            key=lambda x: x['score'],
-            reverse=True
-        )
 
-        return {
-            'primary_emotion': primary_emotion,
-            'emotion_scores': emotion_scores,
-            'sentiment_score': round(sentiment_score, 3),
-            'confidence': round(confidence, 3),
-            'urgency': urgency,
-            'all_emotions': all_emotions
-        }
+def normalize_text(text):
+    """
+    Collapse whitespace so trivially different messages share a cache entry
+
+    Case is kept: the model is cased and scores "I'M FINE" differently.
+    """
+    return " ".join(text.split())
+
+
+@functools.lru_cache(maxsize=EMOTION_LRU_SIZE)
+def score_emotion_cached(text):
+    """
+    CACHED EMOTION SCORING
+
+    Per-process LRU in front of the shared Django cache (Redis when
+    configured), in front of score_emotion(). Exceptions are never cached.
+    """
+    cache_key = 'emotion:' + hashlib.sha256(text.encode()).hexdigest()
+
+    try:
+        result = cache.get(cache_key)
     except Exception as e:
-        # Fallback if model fails
-        print(f"Emotion detection error")
-        return {
-            'primary_emotion': 'neutral',
-            'emotion_scores': {'neutral': 1.0},
-            'sentiment_score': 0.0,
-            'confidence': 0.0,
-            'urgency': 'low',
-            'all_emotions': [],
-            'error': str(e)
-        }
+        # Shared cache down or Django not configured (standalone scripts)
+        logger.debug(f"Emotion cache unavailable: {e}")
+        return score_emotion(text)
+
+    if result is None:
+        result = score_emotion(text)
+        cache.set(cache_key, result, EMOTION_CACHE_TIMEOUT)
+
+    return result
+
+
+def score_emotion(text):
+    """
+    Run the classifier and derive sentiment/urgency for one message
+
+    Returns:
+        tuple: (primary_emotion, ((label, score), ...), sentiment_score,
+                confidence, urgency, ((label, score), ...) ranked high to low)
+    """
+    # Trivial messages skip the model; everything else runs
+    # transformer inference (batched with concurrent requests)
+    probs = fast_path_probs(text)
+    if probs is None:
+        probs = emotion_batcher.submit(text)
+
+    # Scores are rounded first, matching what callers see
+    probs = np.round(np.asarray(probs, dtype=np.float64), 4)
+
+    # Identify primary emotion (highest score)
+    primary_idx = int(probs.argmax())
+    primary_emotion = LABEL_NAMES[primary_idx]
+    confidence = float(probs[primary_idx])
+
+    # Calculate overall sentiment
+    # Positive emotions: joy
+    # Negative emotions: anger, disgust, fear, sadness
+    # Neutral: neutral, surprise (can be either)
+    positive_score = float(probs[POSITIVE_IDX].sum())
+    negative_score = float(probs[NEGATIVE_IDX].sum())
+
+    # Calculates sentiment score: from -1 to 1
+    # -1 -> negative sentiment
+    # 0 -> neutral
+    # +1 -> positive sentiment
+    if positive_score + negative_score > 0:
+        sentiment_score = (positive_score - negative_score) / (positive_score + negative_score)
+    else:
+        sentiment_score = 0.0
+
+    scores = probs.tolist()
+    emotion_scores = dict(zip(LABEL_NAMES, scores))
+
+    # Determine urgency based on emotion + confidence
+    urgency = calculate_urgency(primary_emotion, confidence, emotion_scores)
+
+    # Rank all emotions, from highest score to lowest (ties keep label order).
+    # Labels and scores are reordered in numpy, then zipped in one pass
+    order = np.argsort(-probs, kind='stable')
+    all_emotions = zip(LABEL_ARRAY[order].tolist(), probs[order].tolist())
+
+    return (
+        primary_emotion,
+        tuple(emotion_scores.items()),
+        round(sentiment_score, 3),
+        round(confidence, 3),
+        urgency,
+        tuple(all_emotions)
+    )
+
+
+# Emotion groups used by calculate_urgency()
+HIGH_URGENCY_EMOTIONS = frozenset({'fear', 'sadness'})
+MEDIUM_URGENCY_EMOTIONS = frozenset({'anger', 'disgust'})
 
 
 def calculate_urgency(primary_emotion, confidence, emotion_scores):
@@ -148,24 +659,16 @@ def calculate_urgency(primary_emotion, confidence, emotion_scores):
     """
 
     # High urgency emotions
-    if primary_emotion in ['fear', 'sadness'] and confidence > 0.6:
+    if primary_emotion in HIGH_URGENCY_EMOTIONS and confidence > 0.6:
         return 'high'
     
     # Medium urgency emotions
-    if primary_emotion in ['anger', 'disgust'] and confidence > 0.5:
+    if primary_emotion in MEDIUM_URGENCY_EMOTIONS and confidence > 0.5:
         return 'medium'
     
     # if multiple negative emotions are present
-    negative_emotions = [
-        'anger',
-        'disgust',
-        'fear',
-        'sadness'
-    ]
-    negative_total = sum(
-        emotion_scores.get(e, 0)
-        for e in negative_emotions
-    )
+    get = emotion_scores.get
+    negative_total = get('anger', 0) + get('disgust', 0) + get('fear', 0) + get('sadness', 0)
 
     if negative_total > 0.7:
         return 'high'
@@ -173,6 +676,7 @@ def calculate_urgency(primary_emotion, confidence, emotion_scores):
         return 'medium'
     return 'low'
 
+
 def adapt_prompt_to_emotion(base_prompt, emotion_data):
     """
     DYNAMIC PROMPT ENGINEERING
@@ -187,133 +691,34 @@ def adapt_prompt_to_emotion(base_prompt, emotion_data):
     Returns:
         str: Emotion-adapted system prompt
     """
+    # Collapse the key space to (adaptation block, high urgency or not),
+    # so the cache holds at most 14 entries (7 blocks x 2) per base prompt
     primary_emotion = emotion_data['primary_emotion']
-    confidence = emotion_data['confidence']
-    urgency = emotion_data['urgency']
-
-    # Build emotion specific adaptations
-    adaptations = []
+    adaptation_key = (
+        primary_emotion if primary_emotion in ADAPTATION_BY_EMOTION
+        else '_default'
+    )
 
-    # FEAR (anxiety, worry, panic)
-    if primary_emotion == 'fear':
-        adaptations.append("""
-DETECTED EMOTION: FEAR/ANXIETY
+    return build_adapted_prompt(
+        base_prompt,
+        adaptation_key,
+        emotion_data['urgency'] == 'high'
+    )
 
-ADAPTED RESPONSE STRATEGY:
-- Prioritize grounding and safety
-- Use calming, reassuring language
-- Offer immediate anxiety-reduction techniques
-- Avoid overwhelming with too many questions
-- Create sense of control
 
-Recommended interventions: Breathing exercises, grounding (5-4-3-2-1), progressive muscle relaxation
+@functools.lru_cache(maxsize=16)
+def build_adapted_prompt(base_prompt, adaptation_key, high_urgency):
+    """
+    Assemble (and memoize) the adapted prompt for one emotion/urgency pair
+    """
+    adaptations = [ADAPTATION_BY_EMOTION[adaptation_key]]
 
-Example opening: "I hear how anxious you're feeling. Let's take this one step at a time. First, let's try something to help calm your nervous system."
-        """)
-    
-    # SADNESS (depression, grief, loss)
-    elif primary_emotion == 'sadness':
-        adaptations.append("""
-DETECTED EMOTION: SADNESS/DEPRESSION
-
-ADAPTED RESPONSE STRATEGY:
-- Lead with deep validation and empathy
-- Acknowledge the pain without rushing to fix
-- Use gentle, warm language
-- Normalize the feeling of sadness
-- Explore underlying causes slowly
-- Offer hope without dismissing pain
-
-Recommended interventions: Gratitude journaling, behavioral activation, self-compassion
-
-Example opening: "I hear the sadness in your message. It's okay to feel this way, and you're not alone. Can you share what's been weighing most heavily on your heart?"
-        """)
-    
-    # ANGER (frustration, irritation)
-    elif primary_emotion == 'anger':
-        adaptations.append("""
-DETECTED EMOTION: ANGER/FRUSTRATION
-
-ADAPTED RESPONSE STRATEGY:
-- Validate the anger as legitimate
-- Help identify what's underneath (often hurt, fear, or unmet needs)
-- Offer healthy expression outlets
-- Avoid dismissing or minimizing
-- Help channel anger constructively
-
-Recommended interventions: Anger diary, physical activity, assertiveness training
-
-Example opening: "I hear your frustration, and it sounds like you have good reasons to feel angry. What's at the core of what's upsetting you?"
-        """)
-    
-    # JOY (happiness, excitement)
-    elif primary_emotion == 'joy':
-        adaptations.append("""
-DETECTED EMOTION: JOY/HAPPINESS
-
-ADAPTED RESPONSE STRATEGY:
-- Celebrate the positive moment genuinely
-- Explore what contributed to this feeling
-- Reinforce healthy patterns and coping strategies
-- Build on momentum
-- Help them savor the positive
-
-Example opening: "It's wonderful to hear you're feeling good! What's been going well for you?"
-        """)
-    
-    # DISGUST (revulsion, contempt)
-    elif primary_emotion == 'disgust':
-        adaptations.append("""
-DETECTED EMOTION: DISGUST
-
-ADAPTED RESPONSE STRATEGY:
-- Explore what's triggering this strong reaction
-- Often relates to violation of values or boundaries
-- Validate their standards while exploring flexibility
-- Help process the strong reaction
-
-Example opening: "It sounds like something has really bothered you. What happened that triggered such a strong reaction?"
-        """)
-    
-    # SURPRISE (unexpected events)
-    elif primary_emotion == 'surprise':
-        adaptations.append("""
-DETECTED EMOTION: SURPRISE
-
-ADAPTED RESPONSE STRATEGY:
-- Help process the unexpected event
-- Explore whether surprise is positive or negative
-- Support adjustment to new information
-
-Example opening: "It sounds like something unexpected happened. Tell me more about what surprised you."
-        """)
-    
-    # NEUTRAL or LOW CONFIDENCE
-    else:
-        adaptations.append("""
-DETECTED EMOTION: NEUTRAL or UNCLEAR
-
-ADAPTED RESPONSE STRATEGY:
-- Standard therapeutic approach
-- Ask open-ended questions to understand more
-- Let the conversation develop naturally
-- Stay warm and supportive
-        """)
-    
     # Add urgency note if high
-    if urgency == 'high':
-        adaptations.append("""
-⚠️ HIGH URGENCY DETECTED
-- User may be in significant distress
-- Prioritize immediate support and safety
-- Consider crisis resources if appropriate
-- Be especially gentle and validating
-        """)
-    
+    if high_urgency:
+        adaptations.append(HIGH_URGENCY_ADAPTATION)
+
     # Combine base prompt with adaptations
-    adapted = base_prompt + "\n\n" + "\n".join(adaptations)
-    
-    return adapted
+    return base_prompt + "\n\n" + "\n".join(adaptations)
 
 def get_emotion_insights(emotion_data):
     """
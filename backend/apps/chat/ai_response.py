@@ -9,7 +9,8 @@ This module orchestrates:
 4. Error handling and fallbacks
 """
 
-import os
+import random
+import time
 from groq import Groq
 from decouple import config
 import logging
@@ -19,6 +20,9 @@ from apps.chat.ai_engine import adapt_prompt_to_emotion, analyze_emotion
 # setup logger
 logger = logging.getLogger(__name__)
 
+# Base delay between Groq retries (doubles each attempt, plus jitter)
+RETRY_BACKOFF_SECONDS = 0.5
+
 try:
     groq_client = Groq(
         api_key=config('GROQ_API_KEY')
@@ -28,6 +32,28 @@ except Exception as e:
     logger.error(f"Failed to initialize Groq client: {e}")
     groq_client = None
 
+# Generation settings for stream_completion, which both get_ai_response
+# and stream_ai_response go through
+COMPLETION_OPTIONS = dict(
+    # This is the actual AI inference using 70B parameters
+    model="openai/gpt-oss-20b",
+
+    # Temperature controls randomness
+    # 0.7 = balanced (not too robotic, not too random)
+    temperature=0.7,
+
+    # Max tokens = max response length
+    # ~300 tokens ≈ 150-200 words
+    max_tokens=300,
+
+    # Top-p sampling (nucleus sampling)
+    # 0.9 = consider top 90% probable tokens
+    top_p=0.9,
+
+    # Stop sequences (optional - stops generation if these appear)
+    stop=None,
+)
+
 
 def format_chat_history(messages_queryset):
     """
@@ -36,7 +62,8 @@ def format_chat_history(messages_queryset):
     Converts Django QuerySet of ChatMessage objects into format Groq expects
     
     Args:
-        messages_queryset: QuerySet of ChatMessage objects (ordered chronologically)
+        messages_queryset: QuerySet of ChatMessage objects (ordered chronologically),
+            or a list of them (e.g. from ChatMessage.get_user_history)
         
     Returns:
         List of message dicts in format:
@@ -51,25 +78,161 @@ def format_chat_history(messages_queryset):
         formatted = format_chat_history(history)
     """
 
-    formatted_messages = []
+    # Querysets only fetch the two columns, as plain tuples
+    # (no model instances); lists of instances are read as-is
+    if hasattr(messages_queryset, 'values_list'):
+        rows = list(messages_queryset.values_list('message', 'response'))
+    else:
+        rows = [(msg.message, msg.response) for msg in messages_queryset]
 
-    for msg in messages_queryset:
-        # Add user message
-        formatted_messages.append(
-            {
-                "role": "user",
-                "content": msg.message
-            }
-        )
+    # Two entries per exchange: user message, then AI response
+    formatted_messages = [None] * (2 * len(rows))
 
-        # Add ai response
-        formatted_messages.append({
+    for i, (message, response) in enumerate(rows):
+        formatted_messages[2 * i] = {
+            "role": "user",
+            "content": message
+        }
+        formatted_messages[2 * i + 1] = {
             'role': 'assistant',
-            'content': msg.response
-        })
+            'content': response
+        }
 
     return formatted_messages
 
+def build_messages(user_message, conversation_history, emotion_data):
+    """
+    Build the message array sent to Groq
+
+    System prompt (adapted to the user's emotion), then the conversation
+    history for context, then the current user message.
+    """
+    adapted_prompt = adapt_prompt_to_emotion(
+        FULL_THERAPIST_PROMPT, emotion_data
+    )
+
+    # Build complete message array for Groq
+    messages = [
+        # System message - defines AI behaviour
+        {
+            "role": "system",
+            "content": adapted_prompt
+        }
+    ]
+
+    # Add conversation history (context)
+    # This allows AI to remember previous messages
+    messages.extend(conversation_history)
+
+    # Add current user's message
+    messages.append({
+        "role": "user",
+        "content": user_message
+    })
+
+    return messages
+
+
+def stream_completion(messages):
+    """
+    Call Groq with streaming enabled and yield text chunks as they arrive
+
+    The HTTP stream is closed if the consumer stops early
+    (e.g. the client disconnected), so Groq stops generating.
+    """
+    completion = groq_client.chat.completions.create(
+        messages=messages,
+        **COMPLETION_OPTIONS,
+
+        # Receive tokens as they are generated
+        stream=True
+    )
+
+    try:
+        for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        completion.close()
+
+
+def retry_delay(attempt):
+    """
+    Exponential backoff with jitter between Groq attempts (seconds)
+    """
+    backoff = RETRY_BACKOFF_SECONDS * (2 ** attempt)
+    return backoff + random.uniform(0, backoff)
+
+
+def backoff_before_retry(attempt):
+    """
+    Sleep before the next Groq attempt
+    """
+    time.sleep(retry_delay(attempt))
+
+
+class StreamInterrupted(Exception):
+    """Groq failed after part of a streamed reply was already sent"""
+
+
+def stream_ai_response(
+    user_message,
+    conversation_history,
+    emotion_data,
+    max_retries=2
+):
+    """
+    STREAMING AI RESPONSE
+
+    Same as get_ai_response(), but yields the reply in chunks as Groq
+    generates them so the client sees the first words within a few
+    hundred milliseconds.
+
+    Retries only happen before the first chunk is sent; once text has
+    reached the client a failure raises StreamInterrupted, since the
+    reply is incomplete. If Groq is unavailable the fallback response is
+    yielded as a single chunk.
+
+    Yields:
+        str: pieces of the AI-generated therapeutic response
+    """
+    # Check if groq has been initialized yet
+    if groq_client is None:
+        logger.error("Groq client not initialized")
+        yield get_fallback_response()
+        return
+
+    messages = build_messages(user_message, conversation_history, emotion_data)
+
+    for attempt in range(max_retries + 1):
+        started = False
+        try:
+            for text in stream_completion(messages):
+                started = True
+                yield text
+
+            if started:
+                return
+
+            logger.warning("AI response empty, using fallback")
+            break
+
+        except Exception as e:
+            logger.error(
+                f"Groq API error (attempt {attempt + 1}/{max_retries + 1}): {e}"
+            )
+
+            # Part of the reply was already sent; it can't be retried cleanly
+            if started:
+                raise StreamInterrupted(str(e)) from e
+
+            if attempt < max_retries:
+                backoff_before_retry(attempt)
+
+    # If all retries failed, return fallback
+    yield get_fallback_response()
+
+
 def get_ai_response(
     user_message,
     conversation_history,
@@ -110,78 +273,33 @@ def get_ai_response(
     if groq_client is None:
         logger.error("Groq client not initialized")
         return get_fallback_response()
-    try:
-        adapted_prompt = adapt_prompt_to_emotion(
-            FULL_THERAPIST_PROMPT, emotion_data
-        )
 
-        # Build complete message array for Groq
-        messages = [
-            # System message - defines AI behaviour
-            {
-                "role": "system",
-                "content": adapted_prompt
-            }
-        ]
+    # Prompt and message list are built once and reused across retries
+    messages = build_messages(user_message, conversation_history, emotion_data)
 
-        # STEP 3: Add conversation history (context)
-        # This allows AI to remember previous messages
-        messages.extend(conversation_history)
+    for attempt in range(max_retries + 1):
+        try:
+            # Collect the streamed chunks into the full reply
+            ai_response = "".join(stream_completion(messages)).strip()
 
-        # Add current user's message
-        messages.append({
-            "role": "user",
-            "content": user_message
-        })
-        
-        # Call Groq API
-        # This is the actual AI inference using 70B parameters
-        completion = groq_client.chat.completions.create(
-            model="openai/gpt-oss-20b",
-            messages=messages,
-            
-            # Temperature controls randomness
-            # 0.7 = balanced (not too robotic, not too random)
-            temperature=0.7,
-            
-            # Max tokens = max response length
-            # ~300 tokens ≈ 150-200 words
-            max_tokens=300,
-            
-            # Top-p sampling (nucleus sampling)
-            # 0.9 = consider top 90% probable tokens
-            top_p=0.9,
-            
-            # Stop sequences (optional - stops generation if these appear)
-            stop=None
-        )
-        
-        # STEP 6: Extract response text
-        ai_response = completion.choices[0].message.content.strip()
-        
-        # STEP 7: Validate response (basic checks)
-        if not ai_response or len(ai_response) < 10:
-            logger.warning("AI response too short, using fallback")
-            return get_fallback_response()
-        
-        return ai_response
-    
-    except Exception as e:
-        # BLOCK 4: ERROR HANDLING
-        logger.error(f"Groq API error: {e}")
-        
-        # Retry logic
-        if max_retries > 0:
-            logger.info(f"Retrying... ({max_retries} attempts left)")
-            return get_ai_response(
-                user_message,
-                conversation_history,
-                emotion_data,
-                max_retries - 1
+            # Validate response (basic checks)
+            if not ai_response or len(ai_response) < 10:
+                logger.warning("AI response too short, using fallback")
+                return get_fallback_response()
+
+            return ai_response
+
+        except Exception as e:
+            # ERROR HANDLING
+            logger.error(
+                f"Groq API error (attempt {attempt + 1}/{max_retries + 1}): {e}"
             )
-        
-        # If all retries failed, return fallback
-        return get_fallback_response()
+
+            if attempt < max_retries:
+                backoff_before_retry(attempt)
+
+    # If all retries failed, return fallback
+    return get_fallback_response()
 
 
 def get_fallback_response():
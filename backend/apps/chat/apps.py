@@ -1,6 +1,46 @@
+import logging
+import os
+import sys
+import time
+
+from decouple import config
 from django.apps import AppConfig
 
+logger = logging.getLogger(__name__)
+
+
+def should_warm_up_models():
+    """
+    Only warm up in processes that opted in with EMOTION_WARMUP=true
+
+    The server entrypoint sets it (e.g. `EMOTION_WARMUP=true gunicorn
+    config.wsgi`); tests, shells, migrations and workers leave it unset
+    and load the model lazily on first use, if at all. Under runserver
+    the autoreloader's parent process is skipped, it never handles
+    requests.
+    """
+    if not config('EMOTION_WARMUP', default=False, cast=bool):
+        return False
+
+    if sys.argv[1:2] == ['runserver']:
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+
+    return True
+
 
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.chat'
+
+    def ready(self):
+        if not should_warm_up_models():
+            return
+
+        # Imported here: loading the module loads the model
+        from apps.chat.ai_engine import warm_up_emotion_model
+
+        started = time.perf_counter()
+        warm_up_emotion_model()
+        logger.info(
+            f"Emotion model warmed up in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
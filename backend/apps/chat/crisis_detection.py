@@ -7,12 +7,42 @@ Multi-layer approach combining:
 4. Multi-level risk classification
 """
 
+import functools
+import itertools
+import logging
 import re
+from types import MappingProxyType
 from typing import Dict, List
-import spacy
 
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: falls back to a regex scan
+    ahocorasick = None
 
-nlp = spacy.load('en_core_web_sm')
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def get_nlp():
+    """
+    spaCy pipeline used for lemmatization, built on first use
+
+    Only token.lemma_ is used, so skip the tagger/parser/NER pipeline:
+    a blank English tokenizer plus a table-lookup lemmatizer (tables from
+    spacy-lookups-data). Processes that never lemmatize (migrations,
+    management commands, shell) never import spaCy.
+    """
+    import spacy
+
+    nlp = spacy.blank('en')
+    nlp.add_pipe('lemmatizer', config={'mode': 'lookup'})
+    nlp.initialize()
+    return nlp
+
+
+# Messages (lowercased) whose lemmas / keyword risk are memoized
+CRISIS_CACHE_SIZE = 10000
 
 # CRISIS KEYWORD DATABASE
 # Organized by risk severity - this is NLP pattern recognition
@@ -80,7 +110,7 @@ CRISIS_KEYWORDS = {
             'wish i could sleep forever', 'tired of life',
             'feel hopeless', 'very depressed', 'extremely anxious',
             'panic attack', 'can\'t cope', 'overwhelmed',
-            'nothing matters', 'tired of trying', 'too much to handle'
+            'nothing matters', 'tired of trying', 'too much to handle',
             
             # Isolation (BASE FORMS)
             'nobody care', 'all alone', 'no one understand',  # "cares" → "care", "understands" → "understand"
@@ -119,6 +149,333 @@ METAPHORICAL_CONTEXTS = {
     ],
 }
 
+# Severity order of risk levels, for comparing two of them
+RISK_RANK = {'SAFE': 0, 'MEDIUM': 1, 'HIGH': 2, 'CRITICAL': 3}
+
+# Keywords per risk level (English + Pidgin) and metaphorical contexts,
+# flattened once at import with duplicates removed (first occurrence kept)
+RISK_KEYWORDS = {
+    risk_level: tuple(dict.fromkeys(
+        keyword for keywords in languages.values() for keyword in keywords
+    ))
+    for risk_level, languages in CRISIS_KEYWORDS.items()
+}
+# (risk_level, keyword) in severity order; a keyword's index is its
+# report order in identify_triggers()
+FLAT_KEYWORDS = tuple(
+    (risk_level, keyword)
+    for risk_level, keywords in RISK_KEYWORDS.items()
+    for keyword in keywords
+)
+METAPHORICAL_KEYWORDS = tuple(dict.fromkeys(
+    keyword for keywords in METAPHORICAL_CONTEXTS.values() for keyword in keywords
+))
+
+# INFLECTED KEYWORD FORMS
+# The keyword lists hold base forms (lemmas). Matching these inflections
+# directly lets "I am killing myself" hit 'kill myself' in the first pass,
+# without waiting for spaCy lemmatization.
+
+WORD_FORMS = {
+    # Pronouns / be (the lemmatizer maps "me" → "I", "is/was" → "be").
+    # The "I" in the keyword lists always stands for "me" (object), so
+    # 'world without I' must not also match "world without i..."
+    'I': ('me',),
+    'be': ('is', 'am', 'are', 'was', 'were', 'been', 'being'),
+    'good': ('better',),
+
+    # Verbs
+    'buy': ('buys', 'bought', 'buying'),
+    'burn': ('burns', 'burned', 'burnt', 'burning'),
+    'care': ('cares', 'cared', 'caring'),
+    'commit': ('commits', 'committed', 'committing'),
+    'cope': ('copes', 'coped', 'coping'),
+    'cut': ('cuts', 'cutting'),
+    'deserve': ('deserves', 'deserved', 'deserving'),
+    'die': ('dies', 'died', 'dying'),
+    'disappear': ('disappears', 'disappeared', 'disappearing'),
+    'end': ('ends', 'ended', 'ending'),
+    'feel': ('feels', 'felt', 'feeling'),
+    'give': ('gives', 'gave', 'given', 'giving'),
+    'go': ('goes', 'went', 'gone', 'going'),
+    'hang': ('hangs', 'hanged', 'hung', 'hanging'),
+    'harm': ('harms', 'harmed', 'harming'),
+    'hate': ('hates', 'hated', 'hating'),
+    'hurt': ('hurts', 'hurting'),
+    'isolate': ('isolates', 'isolated', 'isolating'),
+    'jump': ('jumps', 'jumped', 'jumping'),
+    'kill': ('kills', 'killed', 'killing'),
+    'leave': ('leaves', 'left', 'leaving'),
+    'listen': ('listens', 'listened', 'listening'),
+    'live': ('lives', 'lived', 'living'),
+    'matter': ('matters', 'mattered'),
+    'overwhelm': ('overwhelms', 'overwhelmed', 'overwhelming'),
+    'plan': ('plans', 'planned', 'planning'),
+    'punish': ('punishes', 'punished', 'punishing'),
+    'push': ('pushes', 'pushed', 'pushing'),
+    'run': ('runs', 'ran', 'running'),
+    'say': ('says', 'said', 'saying'),
+    'take': ('takes', 'took', 'taken', 'taking'),
+    'try': ('tries', 'tried', 'trying'),
+    'understand': ('understands', 'understood'),
+    'want': ('wants', 'wanted', 'wanting'),
+    'work': ('works', 'worked', 'working'),
+    'write': ('writes', 'wrote', 'written', 'writing'),
+
+    # Nouns
+    'arrangement': ('arrangements',),
+    'pill': ('pills',),
+    'note': ('notes',),
+    'way': ('ways',),
+}
+
+# Two-word negations and their contractions
+NEGATION_FORMS = {
+    ('can', 'not'): ("can't", 'cannot'),
+    ('do', 'not'): ("don't", 'does not', "doesn't", 'did not', "didn't"),
+    ('be', 'not'): ("isn't", "aren't", "wasn't", "weren't"),
+}
+
+
+def keyword_variants(keyword):
+    """
+    All inflected forms of a base-form keyword (including itself)
+
+    Example:
+        'kill myself' → {'kill myself', 'kills myself', 'killed myself',
+                         'killing myself'}
+    """
+    words = keyword.split()
+    slots = []
+    i = 0
+    while i < len(words):
+        pair = tuple(words[i:i + 2])
+        if pair in NEGATION_FORMS:
+            # "be not" → "was not", "wasn't", ...
+            first_forms = (pair[0],) + WORD_FORMS.get(pair[0], ())
+            slots.append(
+                tuple(f"{form} not" for form in first_forms)
+                + NEGATION_FORMS[pair]
+            )
+            i += 2
+        else:
+            slots.append((words[i],) + WORD_FORMS.get(words[i], ()))
+            i += 1
+
+    return {" ".join(combo) for combo in itertools.product(*slots)}
+
+
+def build_keyword_entries():
+    """
+    Map every text to scan for to what a match means
+
+    Each crisis keyword contributes all its inflected variants; each
+    variant maps to (((order, risk_level, keyword), ...), is_metaphorical),
+    where keyword is the base form reported as a trigger and order is its
+    position in FLAT_KEYWORDS, so matches can be reported in the same
+    order as the keyword lists. Metaphorical contexts are matched as
+    written (variants there would only suppress more alerts).
+    """
+    entries = {}
+    for order, (risk_level, keyword) in enumerate(FLAT_KEYWORDS):
+        for variant in keyword_variants(keyword):
+            crisis, _ = entries.setdefault(variant, ([], False))
+            crisis.append((order, risk_level, keyword))
+
+    for keyword in METAPHORICAL_KEYWORDS:
+        crisis, _ = entries.get(keyword, ([], False))
+        entries[keyword] = (crisis, True)
+
+    return {
+        text: (tuple(crisis), is_metaphorical)
+        for text, (crisis, is_metaphorical) in entries.items()
+    }
+
+
+KEYWORD_ENTRIES = build_keyword_entries()
+
+
+def build_trigger_names():
+    """
+    Map every crisis keyword to the name it is reported under
+
+    Keywords whose inflected variants overlap are the same phrase listed
+    twice (e.g. 'everyone hate I' and 'everyone hates me', 'can not go on'
+    and "can't go on"), so they are grouped and reported once, under the
+    group's first keyword. The lemma "I" is shown as the "me" it stands
+    for in the lists.
+    """
+    # Union-find over keywords that share a variant
+    parent = {keyword: keyword for _, keyword in FLAT_KEYWORDS}
+
+    def find(keyword):
+        while parent[keyword] != keyword:
+            parent[keyword] = parent[parent[keyword]]
+            keyword = parent[keyword]
+        return keyword
+
+    for crisis, _ in KEYWORD_ENTRIES.values():
+        roots = sorted({find(keyword) for _, _, keyword in crisis})
+        for root in roots[1:]:
+            parent[root] = roots[0]
+
+    # Group name: its first keyword in list order
+    first = {}
+    for _, keyword in FLAT_KEYWORDS:
+        first.setdefault(find(keyword), keyword)
+
+    return {
+        keyword: " ".join(
+            'me' if word == 'I' else word for word in first[find(keyword)].split()
+        )
+        for keyword in parent
+    }
+
+
+TRIGGER_NAMES = build_trigger_names()
+
+
+def is_word_char(char):
+    # Same definition as \w in the regex scanner
+    return char.isalnum() or char == '_'
+
+
+def is_whole_words(message, start, end):
+    """
+    True if message[start:end] isn't part of a longer word
+    ('world without me' must not match "world without meaning")
+    """
+    return (
+        (start == 0 or not is_word_char(message[start - 1]))
+        and (end == len(message) or not is_word_char(message[end]))
+    )
+
+
+def build_keyword_automaton():
+    """
+    Build one Aho-Corasick automaton over every keyword
+
+    Values carry the keyword length, to find where a match starts.
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword, entry in KEYWORD_ENTRIES.items():
+        automaton.add_word(keyword, (len(keyword), entry))
+    automaton.make_automaton()
+    return automaton
+
+
+def build_keyword_regex():
+    """
+    Fallback scanner: one precompiled alternation over every keyword
+
+    At each word start the lookahead reports the longest keyword that
+    also ends at a word boundary. Any shorter keyword starting at the same
+    position is a prefix of it ending at a word boundary inside it, so
+    each match expands to those (KEYWORD_CONTAINS); keywords starting
+    elsewhere are matched at their own position.
+    """
+    keywords = sorted(KEYWORD_ENTRIES, key=len, reverse=True)
+    pattern = re.compile(
+        r'(?<!\w)(?=(' + '|'.join(map(re.escape, keywords)) + r')(?!\w))'
+    )
+    contains = {
+        keyword: tuple(
+            KEYWORD_ENTRIES[other] for other in keywords
+            if keyword.startswith(other)
+            and is_whole_words(keyword, 0, len(other))
+        )
+        for keyword in keywords
+    }
+    return pattern, contains
+
+
+# Single pass over the message finds every keyword, whatever the list size
+# (Aho-Corasick; without it a regex as the fallback)
+if ahocorasick is not None:
+    KEYWORD_AUTOMATON = build_keyword_automaton()
+else:
+    KEYWORD_REGEX, KEYWORD_CONTAINS = build_keyword_regex()
+
+
+def build_non_keyword_bytes():
+    """
+    Every byte that never appears in a letter of a crisis keyword
+
+    Used with bytes.translate() to delete those bytes from a message;
+    if nothing is left, no lemma of the message can spell a keyword.
+    """
+    keyword_bytes = set()
+    for text, (crisis, _) in KEYWORD_ENTRIES.items():
+        if crisis:
+            for char in text:
+                if char.isalpha():
+                    keyword_bytes.update(char.encode())
+                    keyword_bytes.update(char.lower().encode())
+
+    return bytes(b for b in range(256) if b not in keyword_bytes)
+
+
+NON_KEYWORD_BYTES = build_non_keyword_bytes()
+
+
+def may_contain_keywords(message_lower):
+    """
+    Cheap prefilter before the spaCy pass
+
+    Lemmas can change letters ("was" → "be"), so only messages with no
+    keyword letters at all (emoji, digits, punctuation, other scripts)
+    are ruled out; everything else still gets lemmatized.
+    """
+    return bool(message_lower.encode().translate(None, NON_KEYWORD_BYTES))
+
+
+def iter_keyword_matches(message_lower):
+    """
+    Yield the entry of every keyword found in the message as whole words
+    (repeats are possible, e.g. a keyword that occurs twice)
+    """
+    if ahocorasick is not None:
+        for end, (length, entry) in KEYWORD_AUTOMATON.iter(message_lower):
+            if is_whole_words(message_lower, end - length + 1, end + 1):
+                yield entry
+        return
+
+    for match in KEYWORD_REGEX.finditer(message_lower):
+        yield from KEYWORD_CONTAINS[match.group(1)]
+
+
+@functools.lru_cache(maxsize=CRISIS_CACHE_SIZE)
+def scan_keywords(message_lower):
+    """
+    Find all crisis/metaphorical keywords in one sweep of the message
+
+    Returns:
+        tuple: (((order, risk_level, keyword), ...) in keyword-list order,
+                is_metaphorical)
+    """
+    hits = set()
+    is_metaphorical = False
+
+    for crisis, metaphorical in iter_keyword_matches(message_lower):
+        is_metaphorical = is_metaphorical or metaphorical
+        hits.update(crisis)
+
+    return tuple(sorted(hits)), is_metaphorical
+
+
+@functools.lru_cache(maxsize=CRISIS_CACHE_SIZE)
+def lemmatize_cached(text):
+    """
+    lemmatize_text() without the error fallback: only successful
+    results are cached, a failure is retried on the next call
+    """
+    # Process text with spaCy
+    doc = get_nlp()(text.lower())
+
+    # Extract lemmas (base forms), joined back into a sentence
+    return " ".join(token.lemma_ for token in doc)
+
+
 def lemmatize_text(text):
     """
     Converts words to their base forms (lemmas)
@@ -135,18 +492,11 @@ def lemmatize_text(text):
         str: Lemmatized text
     """
     try:
-        # Process text with spaCy
-        doc = nlp(text.lower())
-        
-        # Extract lemmas (base forms)
-        lemmas = [token.lemma_ for token in doc]
-        
-        # Join back into sentence
-        return " ".join(lemmas)
+        return lemmatize_cached(text)
     
-    except Exception as e:
+    except Exception:
         # If lemmatization fails, return original
-        print(f"Lemmatization error: {e}")
+        logger.exception("Lemmatization failed")
         return text
 
 def detect_crisis_enhanced(message):
@@ -170,35 +520,95 @@ def detect_crisis_enhanced(message):
         "I am killing myself" → CRITICAL (lemmatized match)
         "This exam killed me" → SAFE (metaphorical context)
     """
-    if not message or len(message.strip()) < 3:
+    # Normalized once; both passes (and their caches) are keyed on it
+    return enhanced_risk_level((message or "").strip().lower())
+
+def enhanced_risk_level(message_lower):
+    """
+    detect_crisis_enhanced() on an already stripped, lowercased message
+    """
+    if len(message_lower) < 3:
         return "SAFE"
     
     #  PASS 1: Check original message (fast path)
-    # This catches exact matches immediately
-    risk_original = detect_crisis_level(message)
+    # This catches exact matches and common inflections immediately
+    risk_original = keyword_risk_level(message_lower)
     
     # If we found critical/high risk already, return immediately
+    # (no spaCy pass); lemmatization only runs as a fallback below that
     if risk_original in ['CRITICAL', 'HIGH']:
         return risk_original
+    # Nothing spaCy could turn into a keyword
+    if not may_contain_keywords(message_lower):
+        return risk_original
     try:
         # Pass 2: Lemmatize and check again (catches variations)
-        lemmatized_message = lemmatize_text(message)
+        lemmatized_message = lemmatize_text(message_lower)
+        return combine_lemmatized_risk(
+            risk_original, message_lower, lemmatized_message
+        )
+    except Exception:
+        logger.exception("Enhanced crisis detection failed")
+    
+    return risk_original
 
-        if lemmatized_message != message.lower():
-            risk_lemmatized = detect_crisis_level(lemmatized_message)
+def combine_lemmatized_risk(risk_original, message_lower, lemmatized_message):
+    """
+    Pass 2 of enhanced detection: re-check the lemmatized message and
+    keep whichever risk level is higher
+    """
+    if lemmatized_message != message_lower:
+        risk_lemmatized = keyword_risk_level(lemmatized_message.lower())
 
-            risk_levels = ['SAFE', 'MEDIUM', 'HIGH', 'CRITICAL']
-                    
-            idx_original = risk_levels.index(risk_original)
-            idx_lemmatized = risk_levels.index(risk_lemmatized)
-            
-            if idx_lemmatized > idx_original:
-                return risk_lemmatized
-    except Exception as e:
-        print(f"Enhanced detection error: {e}")
+        if RISK_RANK[risk_lemmatized] > RISK_RANK[risk_original]:
+            return risk_lemmatized
     
     return risk_original
 
+def detect_crisis_batch(messages, batch_size=64, n_process=1):
+    """
+    BATCH CRISIS DETECTION
+
+    Same result as detect_crisis_enhanced() for each message, but the
+    lemmatization pass runs through nlp.pipe() over the whole batch
+    (for backfills / re-analysing stored history). Pass n_process > 1
+    for large jobs; the lookup lemmatizer is cheap enough that extra
+    processes only pay off on thousands of messages.
+
+    Args:
+        messages (list[str]): User messages
+        
+    Returns:
+        list[str]: Risk level for each message, in the same order
+    """
+    risks = ['SAFE'] * len(messages)
+    needs_lemmas = []  # (index, message_lower)
+
+    # Pass 1 for every message; only those below HIGH need lemmatizing
+    for i, message in enumerate(messages):
+        if not message or len(message.strip()) < 3:
+            continue
+
+        message_lower = message.strip().lower()
+        risks[i] = keyword_risk_level(message_lower)
+
+        if risks[i] not in ['CRITICAL', 'HIGH'] and may_contain_keywords(message_lower):
+            needs_lemmas.append((i, message_lower))
+
+    # Pass 2, lemmatized in batches
+    docs = get_nlp().pipe(
+        (message_lower for _, message_lower in needs_lemmas),
+        batch_size=batch_size,
+        n_process=n_process
+    )
+    for (i, message_lower), doc in zip(needs_lemmas, docs):
+        lemmatized_message = " ".join(token.lemma_ for token in doc)
+        risks[i] = combine_lemmatized_risk(
+            risks[i], message_lower, lemmatized_message
+        )
+
+    return risks
+
 def detect_crisis_level(message):
     """
     MULTI-LAYER CRISIS DETECTION
@@ -223,34 +633,34 @@ def detect_crisis_level(message):
     """
     if not message or len(message.strip()) <= 3:
         return 'SAFE'
-    message_lower = message.lower()
-
-    # Check for metaphorical context first
-    # If message contains metaphorical indicators, be cautious about flagging
-    is_metaphorical = check_metaphorical_context(message_lower)
-
-    # Check critical keywords
-    for keyword in CRISIS_KEYWORDS['CRITICAL']['english'] + CRISIS_KEYWORDS['CRITICAL']['pidgin']:
-        if keyword in message_lower:
-            # If metaphorical context, downgrade the severity
-            if is_metaphorical:
-                return 'HIGH'
-            return 'CRITICAL'
-    
-    # Check HIGH risk keywords
-    for keyword in CRISIS_KEYWORDS['HIGH']['english'] + CRISIS_KEYWORDS['HIGH']['pidgin']:
-        if keyword in message_lower:
-            if is_metaphorical:
-                return 'MEDIUM'
+    return keyword_risk_level(message.lower())
+
+
+@functools.lru_cache(maxsize=CRISIS_CACHE_SIZE)
+def keyword_risk_level(message_lower):
+    """
+    Keyword scan behind detect_crisis_level(), memoized per lowercased message
+    """
+    hits, is_metaphorical = scan_keywords(message_lower)
+    found_levels = {risk_level for _, risk_level, _ in hits}
+
+    # Critical keywords; if metaphorical context, downgrade the severity
+    if 'CRITICAL' in found_levels:
+        if is_metaphorical:
             return 'HIGH'
+        return 'CRITICAL'
     
-    
-    # Check MEDIUM risk keywords
-    for keyword in CRISIS_KEYWORDS['MEDIUM']['english'] + CRISIS_KEYWORDS['MEDIUM']['pidgin']:
-        if keyword in message_lower:
-            if is_metaphorical:
-                return 'SAFE'  # Likely just venting about stress
+    # HIGH risk keywords
+    if 'HIGH' in found_levels:
+        if is_metaphorical:
             return 'MEDIUM'
+        return 'HIGH'
+    
+    # MEDIUM risk keywords
+    if 'MEDIUM' in found_levels:
+        if is_metaphorical:
+            return 'SAFE'  # Likely just venting about stress
+        return 'MEDIUM'
     
     # No crisis indicators found
     return 'SAFE'
@@ -261,12 +671,7 @@ def check_metaphorical_context(message):
 
     Returns True if message contains metaphorically context indicators
     """    
-    for key, keywords in METAPHORICAL_CONTEXTS.items():
-        for keyword in keywords:
-            if keyword in message:
-                return True
-    
-    return False
+    return scan_keywords(message)[1]
 
 def detect_crisis_with_emotion(message, emotion_data):
     """
@@ -284,8 +689,11 @@ def detect_crisis_with_emotion(message, emotion_data):
             'recommendation': str
         }
     """
+    # Lowercased once; risk and triggers share one cached keyword sweep
+    message_lower = (message or "").strip().lower()
+
     # Get base risk from keywords
-    keyword_risk = detect_crisis_enhanced(message)
+    keyword_risk = enhanced_risk_level(message_lower)
 
     # Analyze emotion context
     primary_emotion = emotion_data.get('primary_emotion', 'neutral')
@@ -293,7 +701,7 @@ def detect_crisis_with_emotion(message, emotion_data):
     urgency = emotion_data.get('urgency', 'low')
 
     # Identify specific triggers
-    triggers = identify_triggers(message)
+    triggers = triggers_for(message_lower)
 
     # Adjust risk based on emotion analyses
     # strong negatives emotions +  crisis keyword = higher confidence
@@ -346,16 +754,26 @@ def identify_triggers(message):
     Returns list of detected tigger categories
     """
 
-    triggers = []
-    message_lower = message.lower()
+    return triggers_for(message.strip().lower())
 
-    for risk_level, languages in CRISIS_KEYWORDS.items():
-        for _, keywords in languages.items():
-            for keyword in keywords:
-                if keyword in message_lower:
-                    triggers.append(f"{risk_level}: '{keyword}'")
-    
-    return triggers[:5]  # Return the top 5 to avoid overwhelming output
+def triggers_for(message_lower):
+    """
+    identify_triggers() on an already stripped, lowercased message
+    """
+    # Same (cached) sweep as detect_crisis_level
+    hits, _ = scan_keywords(message_lower)
+
+    # One trigger per phrase (a match can hit several spellings of it),
+    # at its highest risk level
+    triggers = {}
+    for _, risk_level, keyword in hits:
+        triggers.setdefault(TRIGGER_NAMES[keyword], risk_level)
+
+    # Only the top 5 are formatted, to avoid overwhelming output
+    return [
+        f"{risk_level}: '{name}'"
+        for name, risk_level in itertools.islice(triggers.items(), 5)
+    ]
 
 def get_risk_recommendation(risk_level, emotion_data):
     """
@@ -370,114 +788,136 @@ def get_risk_recommendation(risk_level, emotion_data):
     else:
         return "STANDARD_THERAPEUTIC_RESPONSE"
 
-def get_crisis_response(risk_level):
-    """
-    Generate crisis-appropriate response with resources
-    
-    Args:
-        risk_level (str): 'CRITICAL', 'HIGH', 'MEDIUM', or 'SAFE'
-        
-    Returns:
-        dict: Response message and resources
-    """
-    if risk_level == 'CRITICAL':
-        return {
-            'response': """I'm truly concerned about what you're sharing with me. Your safety and wellbeing are what matters most right now.
+# Static crisis responses, built once; read-only views so callers
+# (and the DRF renderer) share them without copying
+CRISIS_RESPONSES = {
+    'CRITICAL': {
+        'response': """I'm truly concerned about what you're sharing with me. Your safety and wellbeing are what matters most right now.
 
 You don't have to face this moment alone. Help is available, and people who care want to support you. Please reach out to one of the emergency services below—they're trained to help and are available right now.
 
 If you're in immediate danger, please call emergency services (112 or 767) right away. 
 
 We're also notifying our support team, and someone from our team may reach out to you to check in. You're valued, and we're here for you. 💙""",
-            
-            'resources': [
-                {
-                    'name': 'National Emergency',
-                    'contact': '112 or 767',
-                    'available': '24/7',
-                    'type': 'emergency'
-                },
-                {
-                    'name': 'Mentally Aware Nigeria (MANI)',
-                    'contact': '+2348091116264',
-                    'available': '24/7',
-                    'type': 'crisis_line'
-                },
-                {
-                    'name': 'LUTH Psychiatry Emergency',
-                    'contact': '+234 1 593 6394',
-                    'available': '24/7',
-                    'type': 'hospital'
-                },
-                {
-                    'name': 'She Writes Woman Crisis Line',
-                    'contact': '+234 813 951 3888',
-                    'available': 'Mon-Fri 10am-6pm',
-                    'type': 'crisis_line'
-                },
-            ],
-            
-            'escalate': True,
-            'immediate_action_required': True
-        }
-    elif risk_level == 'HIGH':
-        return {
-            'response': """I hear you, and I can sense that you're going through something really difficult right now. What you're feeling is valid and important.
+        
+        'resources': [
+            {
+                'name': 'National Emergency',
+                'contact': '112 or 767',
+                'available': '24/7',
+                'type': 'emergency'
+            },
+            {
+                'name': 'Mentally Aware Nigeria (MANI)',
+                'contact': '+2348091116264',
+                'available': '24/7',
+                'type': 'crisis_line'
+            },
+            {
+                'name': 'LUTH Psychiatry Emergency',
+                'contact': '+234 1 593 6394',
+                'available': '24/7',
+                'type': 'hospital'
+            },
+            {
+                'name': 'She Writes Woman Crisis Line',
+                'contact': '+234 813 951 3888',
+                'available': 'Mon-Fri 10am-6pm',
+                'type': 'crisis_line'
+            },
+        ],
+        
+        'escalate': True,
+        'immediate_action_required': True
+    },
+
+    'HIGH': {
+        'response': """I hear you, and I can sense that you're going through something really difficult right now. What you're feeling is valid and important.
 
 The fact that you're reaching out shows strength. You don't have to handle this alone—support is available, and it's okay to ask for help.
 
 If you're feeling overwhelmed, please consider connecting with one of the resources below. They're trained professionals who understand what you're going through and are ready to listen and support you.
 
 Our team may also reach out to check in on you. You matter. 💙""",
-            
-            'resources': [
-                {
-                    'name': 'Mentally Aware Nigeria (MANI)',
-                    'contact': '+234 809 210 6493',
-                    'available': '24/7',
-                    'type': 'crisis_line'
-                },
-                {
-                    'name': 'She Writes Woman',
-                    'contact': '+234 813 951 3888',
-                    'available': 'Mon-Fri 10am-6pm',
-                    'type': 'support_line'
-                },
-                {
-                    'name': 'The Agbeyega Care Centre',
-                    'contact': '+234 803 333 7574',
-                    'available': 'By appointment',
-                    'type': 'therapy_center'
-                },
-            ],
-            
-            'escalate': True,
-            'immediate_action_required': False
-        }
-    
-    elif risk_level == 'MEDIUM':
-        return {
-            'response': """It sounds like you're dealing with some challenging feelings right now, and I appreciate you sharing that with me. That takes courage.
+        
+        'resources': [
+            {
+                'name': 'Mentally Aware Nigeria (MANI)',
+                'contact': '+234 809 210 6493',
+                'available': '24/7',
+                'type': 'crisis_line'
+            },
+            {
+                'name': 'She Writes Woman',
+                'contact': '+234 813 951 3888',
+                'available': 'Mon-Fri 10am-6pm',
+                'type': 'support_line'
+            },
+            {
+                'name': 'The Agbeyega Care Centre',
+                'contact': '+234 803 333 7574',
+                'available': 'By appointment',
+                'type': 'therapy_center'
+            },
+        ],
+        
+        'escalate': True,
+        'immediate_action_required': False
+    },
+
+    'MEDIUM': {
+        'response': """It sounds like you're dealing with some challenging feelings right now, and I appreciate you sharing that with me. That takes courage.
 
 Let's work through this together. I'm here to listen and support you. Sometimes talking through what's happening can help clarify things and make them feel more manageable.
 
 If you'd like additional support, there are resources available to help. Remember, seeking help is a sign of strength, not weakness. 💙""",
-            
-            'resources': [
-                {
-                    'name': 'Mental Health Foundation Nigeria',
-                    'contact': '+234 814 652 3537',
-                    'available': 'Mon-Fri 9am-5pm',
-                    'type': 'information'
-                }
-            ],
-            
-            'escalate': False,
-            'immediate_action_required': False
-        }
+        
+        'resources': [
+            {
+                'name': 'Mental Health Foundation Nigeria',
+                'contact': '+234 814 652 3537',
+                'available': 'Mon-Fri 9am-5pm',
+                'type': 'information'
+            }
+        ],
+        
+        'escalate': False,
+        'immediate_action_required': False
+    },
+}
+
+
+def freeze_crisis_response(response):
+    """
+    Read-only copy of a crisis response (resources become a tuple of
+    read-only mappings)
+    """
+    return MappingProxyType({
+        **response,
+        'resources': tuple(
+            MappingProxyType(resource) for resource in response['resources']
+        )
+    })
+
+
+CRISIS_RESPONSES = MappingProxyType({
+    risk_level: freeze_crisis_response(response)
+    for risk_level, response in CRISIS_RESPONSES.items()
+})
+
+
+def get_crisis_response(risk_level):
+    """
+    Generate crisis-appropriate response with resources
     
-    else:  # SAFE
-        return None  # No crisis response needed
+    Args:
+        risk_level (str): 'CRITICAL', 'HIGH', 'MEDIUM', or 'SAFE'
+        
+    Returns:
+        Mapping: Response message and resources (read-only, shared),
+        or None for SAFE (no crisis response needed)
+    """
+    return CRISIS_RESPONSES.get(risk_level)
 
 
 # TEST FUNCTION
@@ -537,25 +977,25 @@ if __name__ == "__main__":
     print("=" * 70)
 
     # Add to your existing test section
-print("\n" + "=" * 70)
-print("LEMMATIZATION ENHANCEMENT TEST")
-print("=" * 70)
+    print("\n" + "=" * 70)
+    print("LEMMATIZATION ENHANCEMENT TEST")
+    print("=" * 70)
 
-lemma_test_cases = [
-    ("I want to kill myself", "CRITICAL"),
-    ("I am killing myself", "CRITICAL"),  # Should now detect!
-    ("I wanted to end my life", "CRITICAL"),  # Should now detect!
-    ("I'm hurting myself", "HIGH"),  # Should now detect!
-    ("I was feeling hopeless", "MEDIUM"),  # Should now detect!
-]
+    lemma_test_cases = [
+        ("I want to kill myself", "CRITICAL"),
+        ("I am killing myself", "CRITICAL"),  # Should now detect!
+        ("I wanted to end my life", "CRITICAL"),  # Should now detect!
+        ("I'm hurting myself", "HIGH"),  # Should now detect!
+        ("I was feeling hopeless", "MEDIUM"),  # Should now detect!
+    ]
 
-for message, expected in lemma_test_cases:
-    detected = detect_crisis_enhanced(message)
-    is_correct = detected == expected
-    status = "✅" if is_correct else "❌"
+    for message, expected in lemma_test_cases:
+        detected = detect_crisis_enhanced(message)
+        is_correct = detected == expected
+        status = "✅" if is_correct else "❌"
     
     
     
-    print(f"\n{status} Original: \"{message}\"")
-    print(f"   Expected: {expected} | Detected: {detected}")
+        print(f"\n{status} Original: \"{message}\"")
+        print(f"   Expected: {expected} | Detected: {detected}")
 
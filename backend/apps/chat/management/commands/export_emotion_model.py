@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the emotion model to INT8 ONNX (EMOTION_ONNX_PATH); "
+        "run at build/deploy time, before starting workers"
+    )
+
+    def handle(self, *args, **options):
+        # With the 'onnx' backend, importing ai_engine already exports
+        # while loading the model; the call below is then a no-op
+        from apps.chat import ai_engine
+
+        ai_engine.export_quantized_model()
+        self.stdout.write(
+            self.style.SUCCESS(f"Quantized model ready in {ai_engine.EMOTION_ONNX_PATH}")
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='risk_level',
+            field=models.CharField(choices=[('SAFE', 'Safe'), ('MEDIUM', 'Medium Risk'), ('HIGH', 'High Risk'), ('CRITICAL', 'Critical Risk')], default='SAFE', help_text='Crisis detection result', max_length=8),
+        ),
+    ]
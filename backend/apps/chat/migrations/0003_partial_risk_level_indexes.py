@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-15 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_alter_chatmessage_risk_level'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='chatmessage',
+            name='chat_chatme_risk_le_7e642f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='chatmessage',
+            name='chat_chatme_user_id_db64d3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(condition=models.Q(('risk_level__in', ['HIGH', 'CRITICAL'])), fields=['user', '-created_at'], name='crisis_msgs_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(condition=models.Q(('risk_level', 'SAFE')), fields=['user', '-created_at'], name='safe_msgs_idx'),
+        ),
+    ]
@@ -15,12 +15,13 @@ class ChatMessage(models.Model):
     """
     
     # RISK LEVEL CHOICES
-    RISK_LEVELS = [
-        ('SAFE', 'Safe'),
-        ('MEDIUM', 'Medium Risk'),
-        ('HIGH', 'High Risk'),
-        ('CRITICAL', 'Critical Risk'),
-    ]
+    class RiskLevel(models.TextChoices):
+        SAFE = 'SAFE', 'Safe'
+        MEDIUM = 'MEDIUM', 'Medium Risk'
+        HIGH = 'HIGH', 'High Risk'
+        CRITICAL = 'CRITICAL', 'Critical Risk'
+    
+    RISK_LEVELS = RiskLevel.choices
     
     # BLOCK 1: CORE FIELDS
     
@@ -43,9 +44,9 @@ class ChatMessage(models.Model):
     
     # AI Metadata
     risk_level = models.CharField(
-        max_length=20,
-        choices=RISK_LEVELS,
-        default='SAFE',
+        max_length=8,  # Longest value is 'CRITICAL'
+        choices=RiskLevel.choices,
+        default=RiskLevel.SAFE,
         help_text="Crisis detection result"
     )
     
@@ -84,11 +85,20 @@ class ChatMessage(models.Model):
             # Fast queries: "Get user's messages ordered by time"
             models.Index(fields=['user', '-created_at']),
             
-            # Fast queries: "Find all crisis messages"
-            models.Index(fields=['risk_level', '-created_at']),
+            # Fast queries: "Get user's crisis messages" (get_crisis_messages)
+            # Partial index: only the few HIGH/CRITICAL rows are indexed
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(risk_level__in=['HIGH', 'CRITICAL']),
+                name='crisis_msgs_idx',
+            ),
             
-            # Fast queries: "Get recent messages for user with risk level"
-            models.Index(fields=['user', 'risk_level', '-created_at']),
+            # Fast queries: "Get user's recent safe messages" (get_user_history)
+            models.Index(
+                fields=['user', '-created_at'],
+                condition=models.Q(risk_level='SAFE'),
+                name='safe_msgs_idx',
+            ),
         ]
         
         verbose_name = "Chat Message"
@@ -107,7 +117,7 @@ class ChatMessage(models.Model):
     
     def is_crisis(self):
         """Check if this message was flagged as crisis"""
-        return self.risk_level in ['HIGH', 'CRITICAL']
+        return self.risk_level in [self.RiskLevel.HIGH, self.RiskLevel.CRITICAL]
     
     @classmethod
     def get_user_history(cls, user, limit=10):
@@ -121,15 +131,28 @@ class ChatMessage(models.Model):
         Returns:
             QuerySet of ChatMessage objects (ordered chronologically)
         """
-        return cls.objects.filter(
+        # Newest `limit` ids (served by safe_msgs_idx), then the rows
+        # themselves in chronological order, all sorted by the database
+        latest_ids = cls.objects.filter(
             user=user,
-            risk_level='SAFE'  # Exclude crisis messages from context
-        ).order_by('-created_at')[:limit][::-1]  # Reverse to chronological
+            risk_level=cls.RiskLevel.SAFE  # Exclude crisis messages from context
+        ).order_by('-created_at').values('id')[:limit]
+
+        return cls.objects.filter(
+            id__in=models.Subquery(latest_ids)
+        ).only(
+            'message', 'response'  # All the LLM context needs
+        ).order_by('created_at')
     
     @classmethod
     def get_crisis_messages(cls, user):
         """Get all crisis messages for a user"""
-        return cls.objects.filter(
+        # User joined in the same query (__str__ reads user.email);
+        # sentiment/confidence columns aren't loaded
+        return cls.objects.select_related('user').only(
+            'risk_level', 'created_at', 'primary_emotion',
+            'message', 'response', 'user__email'
+        ).filter(
             user=user,
-            risk_level__in=['HIGH', 'CRITICAL']
+            risk_level__in=[cls.RiskLevel.HIGH, cls.RiskLevel.CRITICAL]
         ).order_by('-created_at')
@@ -1,3 +1,179 @@
-from django.test import TestCase
+import json
+from types import SimpleNamespace
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
 
 # Create your tests here.
+from apps.chat import crisis_detection
+from apps.chat.models import ChatMessage
+from apps.chat.crisis_detection import (
+    build_keyword_regex, detect_crisis_level, identify_triggers,
+    iter_keyword_matches, lemmatize_cached, lemmatize_text
+)
+from apps.users.models import Account
+
+try:
+    from apps.chat import ai_response, views
+except ImportError:  # groq / torch not installed
+    ai_response = views = None
+
+
+class CrisisKeywordMatchingTests(SimpleTestCase):
+    """Keyword scan: inflected variants, whole-word matching, triggers"""
+
+    def test_ordinary_text_is_safe(self):
+        # Keywords must match whole words ('world without I' → "me" only)
+        for message in [
+            "A world without internet would be boring",
+            "Everyone hates it when I sing",
+            "The world hates it",
+            "I think the world hates ice cream",
+            "Imagine a world without meaning",
+        ]:
+            with self.subTest(message=message):
+                self.assertEqual(detect_crisis_level(message), 'SAFE')
+
+    def test_crisis_phrases_are_detected(self):
+        for message, expected in [
+            ("I want to kill myself", 'CRITICAL'),
+            ("I am killing myself slowly", 'CRITICAL'),
+            ("The world without me would be fine", 'CRITICAL'),
+            ("Everyone hates me", 'HIGH'),
+            ("I can't go on like this", 'HIGH'),
+            ("I feel hopeless", 'MEDIUM'),
+            ("nobody go miss me", 'HIGH'),
+        ]:
+            with self.subTest(message=message):
+                self.assertEqual(detect_crisis_level(message), expected)
+
+    def test_metaphorical_context_downgrades(self):
+        self.assertEqual(
+            detect_crisis_level("I want to kill myself, this exam is so hard"),
+            'HIGH'
+        )
+
+    def test_each_phrase_is_reported_once(self):
+        self.assertEqual(
+            identify_triggers("everyone hates me"),
+            ["HIGH: 'everyone hate me'"]
+        )
+        self.assertEqual(
+            identify_triggers("i can't go on, this country don finish me"),
+            ["HIGH: 'can not go on'", "HIGH: 'this country don finish me'"]
+        )
+
+    def test_triggers_are_capped_at_five(self):
+        triggers = identify_triggers(
+            "i want to kill myself, everyone hates me, i can't go on, "
+            "i feel hopeless, nobody go miss me, the world without me "
+            "is better, i give up"
+        )
+        self.assertEqual(len(triggers), 5)
+        self.assertEqual(triggers[0], "CRITICAL: 'kill myself'")
+
+    @skipIf(crisis_detection.ahocorasick is None, "pyahocorasick not installed")
+    def test_regex_fallback_matches_automaton(self):
+        pattern, contains = build_keyword_regex()
+        for message in [
+            "i want to kill myself", "i am killing myself",
+            "a world without internet", "the world without me",
+            "everyone hates me and i can't go on", "give up everything",
+            "i dey give up, nothing matters", "killing myselfish",
+            "this exam is killing me", "hello there",
+        ]:
+            with self.subTest(message=message):
+                regex_entries = {
+                    entry
+                    for match in pattern.finditer(message)
+                    for entry in contains[match.group(1)]
+                }
+                self.assertEqual(
+                    set(iter_keyword_matches(message)), regex_entries
+                )
+
+
+def fake_nlp(text):
+    """Stand-in spaCy pipeline: lemma_ strips a trailing 'ing'"""
+    return [
+        SimpleNamespace(lemma_=word[:-3] if word.endswith('ing') else word)
+        for word in text.split()
+    ]
+
+
+class LemmatizerCacheTests(SimpleTestCase):
+    """lemmatize_text: successes are cached, failures are retried"""
+
+    def setUp(self):
+        lemmatize_cached.cache_clear()
+        self.addCleanup(lemmatize_cached.cache_clear)
+
+    def test_failure_is_not_cached(self):
+        with mock.patch.object(
+            crisis_detection, 'get_nlp', side_effect=[RuntimeError, fake_nlp]
+        ):
+            # Falls back to the original text...
+            self.assertEqual(lemmatize_text("Killing time"), "Killing time")
+            # ...and the next call lemmatizes instead of replaying it
+            self.assertEqual(lemmatize_text("Killing time"), "kill time")
+
+    def test_success_is_cached(self):
+        with mock.patch.object(
+            crisis_detection, 'get_nlp', return_value=fake_nlp
+        ) as get_nlp:
+            self.assertEqual(lemmatize_text("killing time"), "kill time")
+            self.assertEqual(lemmatize_text("killing time"), "kill time")
+        self.assertEqual(get_nlp.call_count, 1)
+
+
+def stream_then_fail(*args, **kwargs):
+    """Stand-in Groq stream that breaks after the first chunk"""
+    yield "I hear "
+    raise ConnectionError("stream reset")
+
+
+@skipIf(views is None, "chat AI dependencies not installed")
+class StreamMessageTests(TestCase):
+    """SSE endpoint: a reply cut off mid-stream"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Account.objects.create_user(
+            email='ada@example.com',
+            password='s3cure-Passw0rd',
+            first_name='Ada',
+            last_name='Obi',
+        )
+
+    def test_groq_failure_after_first_chunk_raises(self):
+        chunks = []
+        with mock.patch.object(ai_response, 'groq_client', object()), \
+                mock.patch.object(ai_response, 'stream_completion', stream_then_fail):
+            with self.assertRaises(ai_response.StreamInterrupted):
+                for chunk in ai_response.stream_ai_response("hi", [], {}):
+                    chunks.append(chunk)
+        self.assertEqual(chunks, ["I hear "])
+
+    def test_interrupted_stream_sends_error_and_is_not_saved(self):
+        request = APIRequestFactory().post(
+            '/api/chat/stream/', {'message': 'I feel anxious today'}, format='json'
+        )
+        force_authenticate(request, user=self.user)
+        emotion_data = {'primary_emotion': 'fear', 'confidence': 0.9}
+
+        with mock.patch.object(
+            views, 'analyze_with_history', return_value=(emotion_data, 'LOW', [])
+        ), mock.patch.object(ai_response, 'groq_client', object()), \
+                mock.patch.object(ai_response, 'stream_completion', stream_then_fail):
+            response = views.stream_message(request)
+            events = [
+                json.loads(event[len('data: '):])
+                for event in b''.join(response.streaming_content).decode().split('\n\n')
+                if event
+            ]
+
+        self.assertEqual(events[0], {'delta': "I hear "})
+        self.assertIn('error', events[-1])
+        self.assertNotIn('done', events[-1])
+        self.assertFalse(ChatMessage.objects.exists())
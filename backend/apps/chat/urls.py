@@ -8,6 +8,8 @@ from apps.chat import views
 urlpatterns = [
     # Main chat endpoint
     path('', views.send_message, name='send_message'),
+    # Streaming (Server-Sent Events) variant of the chat endpoint
+    path('stream/', views.stream_message, name='stream_message'),
     path('history/', views.get_chat_history, name='chat_history'),
     path(
         'history/delete/',
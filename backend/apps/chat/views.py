@@ -1,70 +1,40 @@
-from django.shortcuts import render
+from django.http import StreamingHttpResponse
 
 # Create your views here.
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from apps.chat.models import ChatMessage
-from apps.chat.serializers import ChatMessageSerializer, ChatHistorySerializer
+from apps.chat.serializers import ChatHistorySerializer
 from apps.chat.ai_engine import analyze_emotion
 from apps.chat.crisis_detection import detect_crisis_with_emotion, get_crisis_response
-from apps.chat.ai_response import get_ai_response, format_chat_history
+from apps.chat.ai_response import (
+    StreamInterrupted, get_ai_response, stream_ai_response,
+    format_chat_history
+)
 # from twilio.rest import Client
 from apps.chat.utils import send_crisis_alert
 
 logger = logging.getLogger(__name__)
 
+# Emotion/crisis analysis runs here while the request thread queries history
+analysis_executor = ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix='chat-analysis'
+)
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def send_message(request):
+
+def validate_message(user_message):
     """
-    MAIN CHAT ENDPOINT - THE COMPLETE AI PIPELINE
-    
-    Endpoint: POST /api/chat/
-    
-    Request Body:
-    {
-        "message": "I'm feeling anxious about my exams"
-    }
-    
-    Response:
-    {
-        "response": "I hear the anxiety you're feeling...",
-        "emotion": {
-            "primary_emotion": "fear",
-            "sentiment_score": -0.42,
-            "confidence": 0.78,
-            "urgency": "high"
-        },
-        "risk_level": "SAFE",
-        "is_crisis": false,
-        "timestamp": "2024-01-15T10:30:00Z"
-    }
-    
-    OR (if crisis detected):
-    {
-        "response": "I'm very concerned about what you've shared...",
-        "resources": [
-            {"name": "Emergency", "contact": "112"},
-            ...
-        ],
-        "risk_level": "CRITICAL",
-        "is_crisis": true,
-        "immediate_action_required": true
-    }
+    Check message length limits
+
+    Returns:
+        Response with a 400 error, or None if the message is valid
     """
-    
-    # ============================================
-    # EXTRACT & VALIDATE INPUT
-    # ============================================
-    
-    user = request.user
-    user_message = request.data.get('message', '').strip()
-    
     # Validate message exists
     if not user_message:
         return Response(
@@ -85,7 +55,19 @@ def send_message(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    logger.info(f"User {user.email} sent message (length: {len(user_message)})")
+    return None
+
+
+def analyze_message(user_message):
+    """
+    Run emotion analysis and crisis detection on a message
+
+    Both steps fail safe: a failure is logged and neutral/SAFE
+    data is used so the conversation can continue.
+
+    Returns:
+        tuple: (emotion_data, risk_level)
+    """
     
     # ============================================
     # AI EMOTION ANALYSIS
@@ -122,55 +104,52 @@ def send_message(request):
     except Exception as e:
         logger.error(f"Crisis detection failed: {e}")
         # Fail-safe: assume safe if detection fails
-        crisis_data = {
-            'risk_level': 'SAFE',
-            'confidence': 0.0,
-            'triggers': [],
-            'recommendation': 'STANDARD_THERAPEUTIC_RESPONSE'
-        }
         risk_level = 'SAFE'
     
-    # ============================================
-    # CRISIS RESPONSE (If Detected)
-    # ============================================
-    
-    if risk_level in ['CRITICAL', 'HIGH']:
-        logger.critical(f"CRISIS DETECTED for user {user.email}: {risk_level}")
-        
-        # Get crisis response with resources
-        crisis_response = get_crisis_response(risk_level)
-        
-        # Save to database (with crisis flag)
-        chat_message = ChatMessage.objects.create(
-            user=user,
-            message=user_message,
-            response=crisis_response['response'],
-            risk_level=risk_level,
-            primary_emotion=emotion_data.get('primary_emotion'),
-            sentiment_score=emotion_data.get('sentiment_score'),
-            emotion_confidence=emotion_data.get('confidence')
-        )
-        
-        # TODO: Send alert to admin/support team (implement later)
-        # send_crisis_alert(user, chat_message)
-        send_crisis_alert(user, chat_message)
-        
-        # Return crisis response immediately
-        return Response({
-            'response': crisis_response['response'],
-            'resources': crisis_response['resources'],
-            'risk_level': risk_level,
-            'is_crisis': True,
-            'immediate_action_required': crisis_response.get('immediate_action_required', False),
-            'emotion': emotion_data,
-            'timestamp': chat_message.created_at,
-            'message_id': chat_message.id
-        }, status=status.HTTP_201_CREATED)
+    return emotion_data, risk_level
+
+
+def crisis_reply(user, user_message, emotion_data, risk_level):
+    """
+    Save a crisis message, alert the support team and build the response
+    """
+    logger.critical(f"CRISIS DETECTED for user {user.email}: {risk_level}")
     
-    # ============================================
-    # STEP 5: GET CONVERSATION HISTORY (Context)
-    # ============================================
+    # Get crisis response with resources
+    crisis_response = get_crisis_response(risk_level)
     
+    # Save to database (with crisis flag)
+    chat_message = ChatMessage.objects.create(
+        user=user,
+        message=user_message,
+        response=crisis_response['response'],
+        risk_level=risk_level,
+        primary_emotion=emotion_data.get('primary_emotion'),
+        sentiment_score=emotion_data.get('sentiment_score'),
+        emotion_confidence=emotion_data.get('confidence')
+    )
+    
+    # TODO: Send alert to admin/support team (implement later)
+    # send_crisis_alert(user, chat_message)
+    send_crisis_alert(user, chat_message)
+    
+    # Return crisis response immediately
+    return Response({
+        'response': crisis_response['response'],
+        'resources': crisis_response['resources'],
+        'risk_level': risk_level,
+        'is_crisis': True,
+        'immediate_action_required': crisis_response.get('immediate_action_required', False),
+        'emotion': emotion_data,
+        'timestamp': chat_message.created_at,
+        'message_id': chat_message.id
+    }, status=status.HTTP_201_CREATED)
+
+
+def load_conversation_history(user):
+    """
+    Last 10 non-crisis exchanges, formatted for the LLM
+    """
     try:
         # Get last 10 non-crisis messages for context
         history_queryset = ChatMessage.get_user_history(user, limit=10)
@@ -182,6 +161,108 @@ def send_message(request):
         logger.error(f"Failed to retrieve history: {e}")
         conversation_history = []
     
+    return conversation_history
+
+
+def analyze_with_history(user, user_message):
+    """
+    Analyze the message and load conversation history concurrently
+
+    Emotion/crisis analysis (CPU) runs in analysis_executor while this
+    thread runs the history query (I/O). History is loaded even if the
+    message turns out to be a crisis; it is a single small query.
+
+    Returns:
+        tuple: (emotion_data, risk_level, conversation_history)
+    """
+    analysis = analysis_executor.submit(analyze_message, user_message)
+    conversation_history = load_conversation_history(user)
+    emotion_data, risk_level = analysis.result()
+    return emotion_data, risk_level, conversation_history
+
+
+def emotion_summary(emotion_data):
+    """
+    Emotion fields returned to the client with a normal reply
+    """
+    return {
+        'primary_emotion': emotion_data.get('primary_emotion'),
+        'sentiment_score': emotion_data.get('sentiment_score'),
+        'confidence': emotion_data.get('confidence'),
+        'urgency': emotion_data.get('urgency'),
+        'all_emotions': emotion_data.get('all_emotions', [])[:3]  # Top 3
+    }
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def send_message(request):
+    """
+    MAIN CHAT ENDPOINT - THE COMPLETE AI PIPELINE
+    
+    Endpoint: POST /api/chat/
+    
+    Request Body:
+    {
+        "message": "I'm feeling anxious about my exams"
+    }
+    
+    Response:
+    {
+        "response": "I hear the anxiety you're feeling...",
+        "emotion": {
+            "primary_emotion": "fear",
+            "sentiment_score": -0.42,
+            "confidence": 0.78,
+            "urgency": "high"
+        },
+        "risk_level": "SAFE",
+        "is_crisis": false,
+        "timestamp": "2024-01-15T10:30:00Z"
+    }
+    
+    OR (if crisis detected):
+    {
+        "response": "I'm very concerned about what you've shared...",
+        "resources": [
+            {"name": "Emergency", "contact": "112"},
+            ...
+        ],
+        "risk_level": "CRITICAL",
+        "is_crisis": true,
+        "immediate_action_required": true
+    }
+    """
+    
+    # ============================================
+    # EXTRACT & VALIDATE INPUT
+    # ============================================
+    
+    user = request.user
+    user_message = request.data.get('message', '').strip()
+    
+    error_response = validate_message(user_message)
+    if error_response:
+        return error_response
+    
+    logger.info(f"User {user.email} sent message (length: {len(user_message)})")
+    
+    # ============================================
+    # EMOTION ANALYSIS + CRISIS DETECTION
+    # (overlapped with fetching conversation history)
+    # ============================================
+    
+    emotion_data, risk_level, conversation_history = analyze_with_history(
+        user, user_message
+    )
+    
+    # ============================================
+    # CRISIS RESPONSE (If Detected)
+    # ============================================
+    
+    if risk_level in ['CRITICAL', 'HIGH']:
+        return crisis_reply(user, user_message, emotion_data, risk_level)
+    
     # ============================================
     # STEP 6: GENERATE AI THERAPEUTIC RESPONSE
     # ============================================
@@ -240,19 +321,117 @@ def send_message(request):
     
     return Response({
         'response': ai_response,
-        'emotion': {
-            'primary_emotion': emotion_data.get('primary_emotion'),
-            'sentiment_score': emotion_data.get('sentiment_score'),
-            'confidence': emotion_data.get('confidence'),
-            'urgency': emotion_data.get('urgency'),
-            'all_emotions': emotion_data.get('all_emotions', [])[:3]  # Top 3
-        },
+        'emotion': emotion_summary(emotion_data),
         'risk_level': risk_level,
         'is_crisis': False,
         'timestamp': chat_message.created_at,
         'message_id': chat_message.id
     }, status=status.HTTP_201_CREATED)
 
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_message(request):
+    """
+    STREAMING CHAT ENDPOINT (Server-Sent Events)
+    
+    Endpoint: POST /api/chat/stream/
+    
+    Same pipeline and request body as send_message, but the AI reply is
+    streamed as it is generated:
+    
+        data: {"delta": "I hear the "}
+        data: {"delta": "anxiety you're feeling..."}
+        data: {"done": true, "message_id": 42, "emotion": {...}, ...}
+    
+    If Groq fails mid-reply, the stream ends with an error event instead
+    of "done" and the partial reply is not saved:
+    
+        data: {"error": "AI response was interrupted. ...", ...}
+    
+    Validation errors and crisis responses are returned as regular
+    JSON responses, exactly like send_message.
+    """
+    
+    user = request.user
+    user_message = request.data.get('message', '').strip()
+    
+    error_response = validate_message(user_message)
+    if error_response:
+        return error_response
+    
+    logger.info(f"User {user.email} streaming message (length: {len(user_message)})")
+    
+    emotion_data, risk_level, conversation_history = analyze_with_history(
+        user, user_message
+    )
+    
+    if risk_level in ['CRITICAL', 'HIGH']:
+        return crisis_reply(user, user_message, emotion_data, risk_level)
+    
+    def event_stream():
+        chunks = []
+        
+        # If the client disconnects, the generator is closed here,
+        # which closes the Groq stream and stops generation
+        try:
+            for chunk in stream_ai_response(
+                user_message=user_message,
+                conversation_history=conversation_history,
+                emotion_data=emotion_data
+            ):
+                chunks.append(chunk)
+                yield f"data: {json.dumps({'delta': chunk})}\n\n"
+        
+        except StreamInterrupted as e:
+            # A truncated reply is not saved to history
+            logger.error(f"AI response stream interrupted: {e}")
+            error = {
+                'error': 'AI response was interrupted. Please try again.',
+                'is_crisis': False
+            }
+            yield f"data: {json.dumps(error)}\n\n"
+            return
+        
+        ai_response = "".join(chunks).strip()
+        logger.info(f"AI response streamed (length: {len(ai_response)})")
+        
+        done = {
+            'done': True,
+            'emotion': emotion_summary(emotion_data),
+            'risk_level': risk_level,
+            'is_crisis': False
+        }
+        
+        try:
+            chat_message = ChatMessage.objects.create(
+                user=user,
+                message=user_message,
+                response=ai_response,
+                risk_level=risk_level,
+                primary_emotion=emotion_data.get('primary_emotion'),
+                sentiment_score=emotion_data.get('sentiment_score'),
+                emotion_confidence=emotion_data.get('confidence')
+            )
+            done['timestamp'] = chat_message.created_at.isoformat()
+            done['message_id'] = chat_message.id
+        
+        except Exception as e:
+            logger.error(f"Failed to save message: {e}")
+            done['warning'] = 'Message not saved to history'
+            done['timestamp'] = None
+        
+        yield f"data: {json.dumps(done)}\n\n"
+    
+    response = StreamingHttpResponse(
+        event_stream(),
+        content_type='text/event-stream'
+    )
+    # Disable caching and proxy buffering so chunks reach the client immediately
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_chat_history(request):
@@ -295,8 +474,8 @@ def get_chat_history(request):
     if not include_crisis:
         queryset = queryset.filter(risk_level='SAFE')
     
-    # Order by newest first, limit results
-    messages = queryset.order_by('-created_at')[:limit]
+    # Order by newest first, limit results (only the serialized columns)
+    messages = queryset.only(*ChatHistorySerializer.Meta.fields).order_by('-created_at')[:limit]
     
     # Serialize
     serializer = ChatHistorySerializer(messages, many=True)
@@ -5,3 +5,10 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
     label = 'users'
+
+    def ready(self):
+        from django.conf import settings
+
+        from apps.users.authentication import register_cached_hmac
+
+        register_cached_hmac(settings.SIMPLE_JWT.get('ALGORITHM', 'HS256'))
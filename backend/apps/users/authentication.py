@@ -0,0 +1,102 @@
+import hmac
+
+import jwt
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import HMACAlgorithm
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Columns loaded for request.user on authenticated requests: everything
+# authentication, permissions and the views read from it (phone_number:
+# send_crisis_alert; is_staff/is_superuser: permission checks;
+# date_of_birth/age_bucket: get_age and is_minor). Any other field is
+# deferred and costs one extra query the first time it is read, so add
+# it here when request.user starts reading it.
+AUTH_USER_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'phone_number', 'is_active',
+    'is_verified', 'is_staff', 'is_superuser', 'date_of_birth',
+    'age_bucket', 'password',
+)
+
+
+class CachedHMACAlgorithm(HMACAlgorithm):
+    """
+    HMAC signing/verification that reuses the keyed hash state
+
+    hmac.new() pads and hashes the key (ipad/opad) every call; with a
+    single signing key that work is done once and each token only
+    copies the prepared state.
+    """
+
+    def __init__(self, hash_alg):
+        super().__init__(hash_alg)
+        self.keyed = {}
+
+    def sign(self, msg, key):
+        base = self.keyed.get(key)
+        if base is None:
+            base = self.keyed[key] = hmac.new(key, digestmod=self.hash_alg)
+        mac = base.copy()
+        mac.update(msg)
+        return mac.digest()
+
+
+HMAC_HASHES = {
+    'HS256': HMACAlgorithm.SHA256,
+    'HS384': HMACAlgorithm.SHA384,
+    'HS512': HMACAlgorithm.SHA512,
+}
+
+
+class AccountJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that loads request.user with one narrow query
+
+    .get() emits LIMIT 21 over every column; filter().first() on the
+    primary key emits LIMIT 1 and .only() trims the row to what
+    authentication and the views read.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        user = self.user_model.objects.only(*AUTH_USER_FIELDS).filter(
+            **{api_settings.USER_ID_FIELD: user_id}
+        ).order_by().first()
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."),
+                    code="password_changed"
+                )
+
+        return user
+
+
+def register_cached_hmac(algorithm):
+    """
+    Swap PyJWT's implementation of `algorithm` (e.g. 'HS256') for
+    CachedHMACAlgorithm; simple-jwt encodes/decodes through PyJWT's
+    module-level functions, so every token uses it
+    """
+    if algorithm not in HMAC_HASHES:
+        return
+    jwt.unregister_algorithm(algorithm)
+    jwt.register_algorithm(
+        algorithm, CachedHMACAlgorithm(HMAC_HASHES[algorithm])
+    )
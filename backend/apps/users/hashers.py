@@ -0,0 +1,20 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with the OWASP minimum parameters (19 MiB is the floor;
+    ~46 MiB, t=2, p=1 here)
+
+    Django's defaults (100 MiB, 8 lanes) make a single hash the slowest
+    step of register/login. Re-check on production hardware that one hash
+    stays around 50ms:
+
+        python -m timeit -s "from apps.users.hashers import \\
+            TunedArgon2PasswordHasher as H; h = H()" "h.encode('x', h.salt())"
+
+    Existing hashes with other parameters are upgraded on next login.
+    """
+    time_cost = 2
+    memory_cost = 47104  # KiB
+    parallelism = 1
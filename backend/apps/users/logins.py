@@ -0,0 +1,81 @@
+"""
+Batched last_login writes
+
+Logins are recorded in a Redis sorted set (user id -> timestamp) and
+written to the database in one UPDATE by the flush_logins management
+command, instead of one UPDATE per login on the request path.
+
+Batching is opt-in: it needs REDIS_URL *and* LOGIN_FLUSH_SCHEDULED=true,
+set only where `manage.py flush_logins` is scheduled (e.g. cron every
+30s). Otherwise last_login is updated immediately, so it is never left
+queued with nothing to flush it.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+import redis
+from django.conf import settings
+from django.contrib.auth.models import update_last_login
+from django.db import models
+
+from apps.users.models import Account
+
+logger = logging.getLogger(__name__)
+
+LOGIN_FLUSH_KEY = 'login_flush'
+
+redis_client = (
+    redis.Redis.from_url(settings.REDIS_URL)
+    if settings.REDIS_URL and settings.LOGIN_FLUSH_SCHEDULED
+    else None
+)
+
+
+def record_login(user):
+    """Queue user's last_login for the next flush"""
+    if redis_client is None:
+        update_last_login(None, user)
+        return
+
+    try:
+        redis_client.zadd(
+            LOGIN_FLUSH_KEY, {user.pk: datetime.now(timezone.utc).timestamp()}
+        )
+    except redis.RedisError:
+        logger.exception("Could not queue login, writing last_login directly")
+        update_last_login(None, user)
+
+
+def flush_logins():
+    """
+    Write all queued logins in a single UPDATE
+
+    Returns:
+        int: number of accounts updated
+    """
+    if redis_client is None:
+        return 0
+
+    # Read and clear atomically so logins queued meanwhile aren't lost
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.zrange(LOGIN_FLUSH_KEY, 0, -1, withscores=True)
+    pipe.delete(LOGIN_FLUSH_KEY)
+    logins, _ = pipe.execute()
+
+    if not logins:
+        return 0
+
+    last_login = {
+        int(user_id): datetime.fromtimestamp(ts, tz=timezone.utc)
+        for user_id, ts in logins
+    }
+    return Account.objects.filter(pk__in=last_login).update(
+        last_login=models.Case(
+            *(
+                models.When(pk=user_id, then=models.Value(logged_in))
+                for user_id, logged_in in last_login.items()
+            ),
+            output_field=models.DateTimeField()
+        )
+    )
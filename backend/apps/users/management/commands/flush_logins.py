@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.logins import flush_logins
+
+
+class Command(BaseCommand):
+    help = (
+        "Write queued logins to Account.last_login; schedule every 30s "
+        "when LOGIN_FLUSH_SCHEDULED is enabled"
+    )
+
+    def handle(self, *args, **options):
+        updated = flush_logins()
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated last_login for {updated} account(s)")
+        )
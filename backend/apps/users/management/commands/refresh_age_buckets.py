@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.users.models import Account
+
+
+class Command(BaseCommand):
+    help = "Recompute Account.age_bucket from date_of_birth (run daily)"
+
+    def handle(self, *args, **options):
+        today = date.today()
+        expression = Account.age_bucket_expression(today)
+
+        # Only rows whose bucket is out of date are written
+        updated = Account.objects.filter(
+            date_of_birth__isnull=False
+        ).exclude(
+            age_bucket=expression
+        ).update(age_bucket=expression)
+
+        # Bucket left behind after a date of birth was cleared
+        updated += Account.objects.filter(
+            date_of_birth__isnull=True, age_bucket__isnull=False
+        ).update(age_bucket=None)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated age bucket for {updated} account(s)")
+        )
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.users.models import Account
+
+# A user's last_active is written at most once per this many seconds
+LAST_ACTIVE_INTERVAL = 60
+
+
+class LastActiveMiddleware:
+    """
+    Record when authenticated users were last seen
+
+    Runs after the view, because DRF's JWT authentication only sets
+    request.user while the view is handled. The cache key acts as a
+    per-user throttle: cache.add() only succeeds once per interval, so
+    most requests never touch the database.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            if cache.add(f'last_active:{user.pk}', 1, LAST_ACTIVE_INTERVAL):
+                Account.objects.filter(pk=user.pk).update(
+                    last_active=timezone.now()
+                )
+
+        return response
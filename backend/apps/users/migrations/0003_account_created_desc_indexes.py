@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-15 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_account_managers_alter_account_is_superuser'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='account',
+            name='users_accou_created_71259b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['-created_at'], name='acct_created_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='acct_active_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-15 12:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_account_created_desc_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='last_active',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
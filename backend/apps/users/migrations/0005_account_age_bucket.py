@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-15 13:10
+
+from datetime import date
+
+from django.db import migrations, models
+
+
+def backfill_age_buckets(apps, schema_editor):
+    # Historical models have no custom methods; the CASE expression only
+    # refers to date_of_birth, so the live model's builder is reused
+    from apps.users.models import Account as LiveAccount
+
+    Account = apps.get_model('users', 'Account')
+    Account.objects.filter(date_of_birth__isnull=False).update(
+        age_bucket=LiveAccount.age_bucket_expression(date.today())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_account_last_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='age_bucket',
+            field=models.SmallIntegerField(blank=True, choices=[(0, 'Under 13'), (1, '13-17'), (2, '18-25'), (3, '26+')], db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_age_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-15 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_account_age_bucket'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='is_superuser',
+            field=models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status'),
+        ),
+    ]
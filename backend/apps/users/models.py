@@ -1,18 +1,41 @@
+from datetime import date
+from functools import cached_property
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+
+def years_ago(today, years):
+    """The date `years` years before today (Feb 29 falls back to Feb 28)"""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
 
 
 class AccountManager(BaseUserManager):
-    def create_user(self, email, password=None, **extra_fields):
+    def create_user(self, email, password=None, skip_email_validation=False,
+                    **extra_fields):
+        """
+        skip_email_validation: the caller already validated the address
+        (e.g. AccountRegisterSerializer's EmailField), don't check it again
+        """
         if not email:
             raise ValueError("Email must be set")
         email = self.normalize_email(email)
-        try:
-            validate_email(email)
-        except ValidationError:
-            raise ValueError("Please enter a valid email address.")
+        if not skip_email_validation:
+            # Cheap structural check rejects obvious garbage before
+            # the EmailValidator regex runs (which still decides the rest,
+            # e.g. allowlisted domains like localhost)
+            if email.count('@') != 1:
+                raise ValueError("Please enter a valid email address.")
+            try:
+                validate_email(email)
+            except ValidationError:
+                raise ValueError("Please enter a valid email address.")
         
         first_name = extra_fields.get('first_name')
         last_name = extra_fields.get('last_name')
@@ -39,6 +62,13 @@ class AccountManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 # Create your models here.
 class Account(AbstractUser):
+    # AGE BUCKET CHOICES
+    class AgeBucket(models.IntegerChoices):
+        CHILD = 0, 'Under 13'
+        TEEN = 1, '13-17'
+        YOUNG_ADULT = 2, '18-25'
+        ADULT = 3, '26+'
+
     # Remove username, use email instead
     username = None
     # Basic Information
@@ -88,6 +118,16 @@ class Account(AbstractUser):
         null=True
     )
 
+    # Denormalised from date_of_birth for SQL filters/aggregates; set on
+    # save() and moved along by the daily refresh_age_buckets command
+    age_bucket = models.SmallIntegerField(
+        choices=AgeBucket.choices,
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False
+    )
+
     has_previous_therapy = models.BooleanField(
         default=False, help_text='Has the user received therapy before?'
     )
@@ -109,9 +149,6 @@ class Account(AbstractUser):
         default=False,
         help_text='Email verification status'
     )
-    is_superuser = models.BooleanField(
-        default=False
-    )    
 
     preferred_language = models.CharField(
         max_length=10,
@@ -138,7 +175,8 @@ class Account(AbstractUser):
     # Tracking
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    last_active = models.DateTimeField(auto_now=True)
+    # Written by LastActiveMiddleware (throttled), not on every save()
+    last_active = models.DateTimeField(default=timezone.now)
     
     # Override username requirement - we use email as username
     USERNAME_FIELD = 'email'
@@ -152,22 +190,68 @@ class Account(AbstractUser):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['email']),
-            models.Index(fields=['created_at'])
+            # Newest-first listing (get_users, default ordering)
+            models.Index(fields=['-created_at'], name='acct_created_desc_idx'),
+            # Same, restricted to active accounts (partial index)
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(is_active=True),
+                name='acct_active_recent_idx',
+            ),
         ]
     
     def __str__(self):
         return f"{self.email} - ({self.get_full_name})"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'date_of_birth' in update_fields:
+            # date_of_birth may have changed since get_age was cached
+            self.__dict__.pop('get_age', None)
+            self.age_bucket = self.age_bucket_for(self.get_age)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'age_bucket'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def age_bucket_for(cls, age):
+        if age is None:
+            return None
+        if age < 13:
+            return cls.AgeBucket.CHILD
+        if age < 18:
+            return cls.AgeBucket.TEEN
+        if age < 26:
+            return cls.AgeBucket.YOUNG_ADULT
+        return cls.AgeBucket.ADULT
+
+    @classmethod
+    def age_bucket_expression(cls, today):
+        """
+        SQL equivalent of age_bucket_for(get_age) as of `today`,
+        for bulk updates
+        """
+        return models.Case(
+            models.When(date_of_birth__gt=years_ago(today, 13),
+                        then=models.Value(cls.AgeBucket.CHILD)),
+            models.When(date_of_birth__gt=years_ago(today, 18),
+                        then=models.Value(cls.AgeBucket.TEEN)),
+            models.When(date_of_birth__gt=years_ago(today, 26),
+                        then=models.Value(cls.AgeBucket.YOUNG_ADULT)),
+            default=models.Value(cls.AgeBucket.ADULT),
+            output_field=models.SmallIntegerField()
+        )
     
-    @property
+    # Computed once per instance (DRF reads these for every serialized row)
+    @cached_property
     def get_full_name(self):
         full_name = f"{self.first_name} {self.last_name}".strip()
         return full_name if full_name else self.email
     
-    @property
+    @cached_property
     def get_age(self):
         if not self.date_of_birth:
             return None
-        from datetime import date
         today = date.today()
         age = today.year - self.date_of_birth.year
         if today.month < self.date_of_birth.month or \
@@ -177,5 +261,7 @@ class Account(AbstractUser):
     
     @property
     def is_minor(self):
-        age = self.get_age()
-        return age is not None and age < 18
+        return (
+            self.age_bucket is not None
+            and self.age_bucket <= self.AgeBucket.TEEN
+        )
@@ -1,34 +1,59 @@
+import hashlib
+import json
+
 from rest_framework import serializers
 from apps.users.models import Account
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.settings import api_settings
-from django.contrib.auth.models import update_last_login
+from apps.users.logins import record_login
+from django.utils import timezone
+
+PHONE_PREFIX = '+234'
+
+
+def format_datetime(value):
+    """Render a datetime exactly like DRF's DateTimeField (ISO 8601, UTC as 'Z')"""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def account_to_dict(user):
+    """
+    Serialized account profile (full_name and age derived)
+
+    A plain dict build, no DRF field binding or introspection; used by
+    the list, profile, login and registration responses.
+
+    Only reads columns of the instance it is given, so a freshly saved
+    user (pk and auto timestamps already set by save()) is serialized
+    without re-fetching it. If related objects are added to the payload,
+    load them on the queryset (select_related/prefetch_related) before
+    calling this, rather than per user here.
+    """
+    date_of_birth = user.date_of_birth
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': user.get_full_name,
+        'phone_number': user.phone_number,
+        'date_of_birth': date_of_birth.isoformat() if date_of_birth else None,
+        'age': user.get_age,
+        'gender': user.gender,
+        'state': user.state,
+        'city': user.city,
+        'has_previous_therapy': user.has_previous_therapy,
+        'preferred_language': user.preferred_language,
+        'is_verified': user.is_verified,
+        'created_at': format_datetime(user.created_at),
+        'last_active': format_datetime(user.last_active),
+    }
 
-class AccountProfileSerializer(serializers.ModelSerializer):
-    full_name = serializers.SerializerMethodField()
-    full_name = serializers.ReadOnlyField(source='get_full_name')
-    age = serializers.ReadOnlyField(source='get_age')
-    class Meta:
-        model = Account
-        fields = [
-            'id',
-            'email',
-            'first_name',
-            'last_name',
-            'full_name',
-            'phone_number',
-            'date_of_birth',
-            'age',
-            'gender',
-            'state',
-            'city',
-            'has_previous_therapy',
-            'preferred_language',
-            'is_verified',
-            'created_at',
-            'last_active',
-        ]
 
 class AccountRegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
@@ -70,7 +95,7 @@ class AccountRegisterSerializer(serializers.ModelSerializer):
         return data
     
     def validate_phone_number(self, value):
-        if value and not value.startswith('+234'):
+        if value and value[:4] != PHONE_PREFIX:
             raise serializers.ValidationError(
                 "Phone number must be in format: +234XXXXXXXXXX"
             )
@@ -89,20 +114,34 @@ class AccountRegisterSerializer(serializers.ModelSerializer):
             state=validated_data.get('state'),
             city=validated_data.get('city'),
             consent_data_storage=validated_data.get('consent_data_storage', False),
+            # Already checked by the serializer's EmailField
+            skip_email_validation=True,
         )
         return user
 
 
+def profile_etag(profile):
+    """
+    ETag for a serialized profile (account_to_dict output)
+
+    Hashes every served field, so any change to the response body
+    gives a new ETag.
+    """
+    body = json.dumps(profile, sort_keys=True, separators=(',', ':'))
+    return f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+
+
 class AccountLoginSerializer(TokenObtainPairSerializer):
     username_field = 'email'
+
     def validate(self, attrs):
         data = super().validate(attrs)
 
-        data['user'] = AccountProfileSerializer(self.user).data
-        data['refresh'] = str(data['refresh'])
-        data['access'] = str(data['access'])
+        # refresh/access are already strings from TokenObtainPairSerializer
+        data['user'] = account_to_dict(self.user)
 
-        if api_settings.UPDATE_LAST_LOGIN:
-            update_last_login(None, self.user)
+        # Batched through Redis (UPDATE_LAST_LOGIN is off so simple-jwt
+        # doesn't also write it)
+        record_login(self.user)
         
         return data
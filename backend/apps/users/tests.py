@@ -1,3 +1,145 @@
-from django.test import TestCase
+import hashlib
+import hmac
+from datetime import date
+from unittest import mock
+
+import jwt
+from django.test import SimpleTestCase, TestCase
+from jwt.algorithms import HMACAlgorithm
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 # Create your tests here.
+from apps.users.authentication import AccountJWTAuthentication, CachedHMACAlgorithm
+from apps.users.models import Account
+from apps.users.views import user_profile
+
+
+class UserProfileETagTests(TestCase):
+    """Conditional GET on the profile endpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Account.objects.create_user(
+            email='ada@example.com',
+            password='s3cure-Passw0rd',
+            first_name='Ada',
+            last_name='Obi',
+            city='Lagos',
+        )
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def get_profile(self, **headers):
+        request = self.factory.get(
+            '/api/users/profile/',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}',
+            **headers
+        )
+        return user_profile(request)
+
+    def test_profile_has_etag(self):
+        response = self.get_profile()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['email'], 'ada@example.com')
+        self.assertTrue(response['ETag'])
+
+    def test_matching_etag_returns_304(self):
+        etag = self.get_profile()['ETag']
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIsNone(response.data)
+
+    def test_profile_edit_changes_etag(self):
+        etag = self.get_profile()['ETag']
+        Account.objects.filter(pk=self.user.pk).update(city='Abuja')
+
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['city'], 'Abuja')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_inactive_account_is_rejected_before_etag(self):
+        etag = self.get_profile()['ETag']
+        Account.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 401)
+
+    def test_tokens_carry_no_profile_claims(self):
+        payload = AccessToken(self.token).payload
+        for claim in ('email', 'first_name', 'last_name', 'is_verified'):
+            self.assertNotIn(claim, payload)
+
+
+class AccountJWTAuthenticationTests(TestCase):
+    """request.user loading for bearer tokens"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Account.objects.create_user(
+            email='ada@example.com',
+            password='s3cure-Passw0rd',
+            first_name='Ada',
+            last_name='Obi',
+            date_of_birth=date(2000, 1, 1),
+        )
+
+    def setUp(self):
+        self.token = AccessToken.for_user(self.user)
+
+    def test_user_is_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = AccountJWTAuthentication().get_user(self.token)
+            # Fields read by permissions and views are not deferred
+            user.is_staff, user.is_superuser, user.get_age, user.is_minor
+        self.assertEqual(user.email, 'ada@example.com')
+
+    def test_inactive_user_is_rejected(self):
+        Account.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            AccountJWTAuthentication().get_user(self.token)
+
+    def test_inactive_user_allowed_when_check_disabled(self):
+        Account.objects.filter(pk=self.user.pk).update(is_active=False)
+        with mock.patch.object(api_settings, 'CHECK_USER_IS_ACTIVE', False):
+            user = AccountJWTAuthentication().get_user(self.token)
+        self.assertEqual(user.pk, self.user.pk)
+
+
+class CachedHMACAlgorithmTests(SimpleTestCase):
+    """Token signing through the cached keyed-hash state"""
+
+    def test_signature_matches_hmac(self):
+        algorithm = CachedHMACAlgorithm(HMACAlgorithm.SHA256)
+        key = algorithm.prepare_key('signing-key')
+        # Repeated and interleaved messages: the cached state is never mutated
+        for msg in [b'header.payload', b'other.payload', b'header.payload']:
+            with self.subTest(msg=msg):
+                self.assertEqual(
+                    algorithm.sign(msg, key),
+                    hmac.new(key, msg, hashlib.sha256).digest()
+                )
+
+    def test_registered_for_pyjwt(self):
+        self.assertIsInstance(
+            jwt.get_algorithm_by_name(api_settings.ALGORITHM),
+            CachedHMACAlgorithm
+        )
+
+    def test_token_round_trip(self):
+        token = AccessToken()
+        token['user_id'] = 7
+        self.assertEqual(AccessToken(str(token))['user_id'], 7)
+
+    def test_tampered_token_is_rejected(self):
+        header, _, signature = str(AccessToken()).split('.')
+        forged = AccessToken()
+        forged['user_id'] = 1
+        with self.assertRaises(TokenError):
+            AccessToken(f"{header}.{str(forged).split('.')[1]}.{signature}")
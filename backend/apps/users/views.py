@@ -1,30 +1,71 @@
-from django.shortcuts import render
-from rest_framework_simplejwt.tokens import RefreshToken
+from datetime import date
+
+import numpy as np
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
 
 # Create your views here.
 from apps.users.serializer import (
-    AccountProfileSerializer, AccountRegisterSerializer,
-    AccountLoginSerializer
+    AccountRegisterSerializer, AccountLoginSerializer,
+    account_to_dict, profile_etag
 )
 from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from apps.users.models import Account
-from rest_framework.decorators import (
-    api_view,
-    permission_classes,
-    authentication_classes
-)
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Columns account_to_dict reads (full_name/age are derived from them)
+PROFILE_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'phone_number',
+    'date_of_birth', 'gender', 'state', 'city', 'has_previous_therapy',
+    'preferred_language', 'is_verified', 'created_at', 'last_active',
+)
+
+def prime_ages(users):
+    """
+    Compute get_age for a page of users in one vectorised pass
+
+    Dates are encoded as YYYYMMDD integers, so the birthday-not-yet-
+    reached correction falls out of the integer division. The results
+    are stored where cached_property looks for them, so get_age reads
+    them back instead of recomputing per user.
+    """
+    dobs = np.fromiter(
+        (
+            dob.year * 10000 + dob.month * 100 + dob.day if dob else -1
+            for dob in (user.date_of_birth for user in users)
+        ),
+        dtype=np.int64,
+        count=len(users)
+    )
+    today = date.today()
+    today_key = today.year * 10000 + today.month * 100 + today.day
+    ages = (today_key - dobs) // 10000
+
+    for user, dob_key, age in zip(users, dobs.tolist(), ages.tolist()):
+        user.__dict__['get_age'] = age if dob_key >= 0 else None
+
+
+class AccountPagination(PageNumberPagination):
+    """Pages of users for get_users (?page=N)"""
+    page_size = 50
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_users(request):
-    users = Account.objects.all()
-    serializer = AccountProfileSerializer(users, many=True)
-    return Response(serializer.data)
+    # Newest first, served by the created_at index
+    users = Account.objects.only(*PROFILE_FIELDS).order_by('-created_at')
+
+    paginator = AccountPagination()
+    page = paginator.paginate_queryset(users, request)
+    prime_ages(page)
+    return paginator.get_paginated_response(
+        [account_to_dict(user) for user in page]
+    )
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -32,16 +73,14 @@ def register_user(request):
     serializer = AccountRegisterSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
+        # Each token is built and signed exactly once
         refresh = RefreshToken.for_user(user)
-        res = {
-            "refresh": str(refresh),
-            "access": str(refresh.access_token)
-        }
+        access_token = refresh.access_token
         return Response({
             'message': 'User registered successfully',
-            'user': AccountProfileSerializer(user).data,
-            "refresh": res['refresh'],
-            "token": res['access']
+            'user': account_to_dict(user),
+            "refresh": str(refresh),
+            "token": str(access_token)
         }, status=status.HTTP_201_CREATED)
     return Response({
         "message": "Registration failed.",
@@ -73,11 +112,22 @@ def refresh(request):
 
 
 @api_view(['GET'])
-@authentication_classes([JWTAuthentication])
 @permission_classes([IsAuthenticated])
 def user_profile(request):
-    user = request.user
-    serializer = AccountProfileSerializer(user)
+    # Authentication already rejected missing/inactive accounts;
+    # request.user only has the auth columns, so load the profile ones
+    user = Account.objects.only(*PROFILE_FIELDS).get(pk=request.user.pk)
+
+    profile = account_to_dict(user)
+    etag = profile_etag(profile)
+
+    # Conditional GET: unchanged profile, no body to send
+    if request.headers.get('If-None-Match') == etag:
+        return Response(
+            status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+        )
 
     # Return serialized profile
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(
+        profile, status=status.HTTP_200_OK, headers={'ETag': etag}
+    )
@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.users.middleware.LastActiveMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -123,6 +124,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# First entry hashes new passwords; the rest still verify older hashes
+
+PASSWORD_HASHERS = [
+    'apps.users.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -155,7 +165,7 @@ AUTH_USER_MODEL = 'users.Account'
 # ============================================
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.AccountJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -175,7 +185,9 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),  # Refresh token expires in 7 days
     'ROTATE_REFRESH_TOKENS': True,  # Get new refresh token when refreshing
     'BLACKLIST_AFTER_ROTATION': True,  # Old tokens become invalid
-    'UPDATE_LAST_LOGIN': True,  # Update last_login field on login
+    # last_login is recorded by AccountLoginSerializer (see
+    # apps/users/logins.py) so it isn't written twice per login
+    'UPDATE_LAST_LOGIN': False,
     
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -194,6 +206,32 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',  # JWT ID for blacklisting
 }
 
+# ============================================
+# CACHE CONFIGURATION
+# ============================================
+# Shared Redis cache across workers when REDIS_URL is set,
+# per-process memory cache otherwise (local development)
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Batch last_login writes through Redis (apps/users/logins.py).
+# Only enable where `manage.py flush_logins` is scheduled (e.g. cron
+# every 30s) and REDIS_URL is set; otherwise logins are written directly.
+LOGIN_FLUSH_SCHEDULED = config('LOGIN_FLUSH_SCHEDULED', default=False, cast=bool)
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8080",  # React development server
 ]